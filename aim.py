@@ -9,10 +9,30 @@
 #
 # Removed: Ghost ball, HUD, Auto-pocket, Click-through, per-color pickers.
 
-import sys, os, json, math
+import sys, os, math, time, functools
+from instrument import FrameStats, PhaseTimer
+STARTUP = PhaseTimer()                 # import/init phase marks, printed by --profile-startup
 from PyQt5 import QtCore, QtGui, QtWidgets
-
-CONFIG_FILE = "pf_config.json"
+STARTUP.mark("import PyQt5")
+import numpy as np
+import geometry as geo
+STARTUP.mark("import numpy + geometry")
+from rack import Rack, triangle, MAX_BALLS
+from scene import SceneModel
+from profiles import ProfileStore
+import predictor
+STARTUP.mark("import overlay modules")
+# calibrate, inputlog, physics, montecarlo, pocketindex and compute are imported where first
+# used (a calibration, a recording, an analysis layer), so startup only pays for what it draws
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pf_config.json")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pf_cache")   # pocket index tables
+AUTOSAVE_MS = 800                      # debounce between the last edit and the background write
+FRAME_CAPS = (60, 120, 144, 240, 0)   # move-apply rate caps offered in the panel; 0 = uncapped
+QUALITY_PRESETS = ("quality", "balanced", "performance")
+INTERACTION_IDLE_MS = 150              # quiet time after the last applied move before a full-quality frame
+PHYSICS_BUDGET_MS = float(os.environ.get("PF_PHYSICS_BUDGET", 4.0))   # simulation slice between cancellation checks
+LAYER_SETTLE_MS = 40                   # analysis submit delay while a ball or the table is moving
 
 def dist(a: QtCore.QPointF, b: QtCore.QPointF) -> float:
     return math.hypot(a.x() - b.x(), a.y() - b.y())
@@ -43,7 +63,21 @@ class IOSSwitch(QtWidgets.QAbstractButton):
         m = 2; d = r.height()-m*2; x = r.width()-m-d if self.isChecked() else m
         p.setBrush(QtGui.QColor("white")); p.drawEllipse(QtCore.QRectF(x,m,d,d))
 
+class LineBatch:
+    # Render commands grouped by pen: flush() switches pen once per style and issues one drawLines
+    def __init__(self):
+        self.groups = {}                # id(pen) -> (pen, [QLineF]), in first-use order
+
+    def add(self, pen: QtGui.QPen, a: QtCore.QPointF, b: QtCore.QPointF):
+        self.groups.setdefault(id(pen), (pen, []))[1].append(QtCore.QLineF(a, b))
+
+    def flush(self, painter: QtGui.QPainter):
+        for pen, lines in self.groups.values():
+            painter.setPen(pen); painter.drawLines(lines)
+        self.groups.clear()
+
 class Overlay(QtWidgets.QWidget):
+
     def __init__(self):
         super().__init__()
         # Window
@@ -61,28 +95,92 @@ class Overlay(QtWidgets.QWidget):
         self.pocket_radius = 14.0      # pocket ring & handle visual radius
         self.handle_radius = 12.0      # hit target for dragging p1/p2
 
+        # Balls: slot 0 = p1 (cue), slot 1 = p2 (object ball), further slots = rest of the rack
+        self.rack = Rack(self.pocket_radius)
+
         # Points
         self.p1 = QtCore.QPointF(self.table_rect.left() + self.table_rect.width()*0.25, self.table_rect.center().y())
         self.p2 = QtCore.QPointF(self.table_rect.right() - self.table_rect.width()*0.25, self.table_rect.center().y())
         self.marker = QtCore.QPointF(self.table_rect.center())
-        self.last_target = 'p2'        # which ball the 1–6 hotkeys will move
+        self.last_target = 'p2'        # which ball ('p1', 'p2', 'b2', ...) the 1–6 hotkeys will move
 
         # State
         self.dragging_handle = None    # legacy press-and-hold drag
         self.locked = False
 
         # NEW: Grab & Drop state (click to pick, click to drop)
-        self.carrying = None           # 'p1' or 'p2' while carrying, else None
+        self.carrying = None           # ball key ('p1', 'p2', 'b2', ...) while carrying, else None
         self.carry_offset = QtCore.QPointF(0, 0)  # keep relative offset at pick-up
 
-        # Semi-lock state for bank/double-bank endpoint (visual only)
-        self._snap_endpoint = None     # QPointF or None (current snapped pocket center)
-        self._snap_active = False      # whether we are currently visually locked
+        # Cached pockets, bank segments and semi-lock (hysteresis) state; refreshed from input handling
+        self.scene = SceneModel()
+
+        # Analysis layers (bank solver, physics preview, pocket odds) run on the compute service.
+        # Each request carries a version; only the newest per layer is drawn, and the last
+        # completed result stays on screen until a newer one arrives.
+        self.compute = None              # ComputeService, created on first request
+        self._version = 0
+        self._requests = {}              # layer -> (version, snapshot key) last submitted
+        self._results = {}               # layer -> last completed result
+        self._completed = {}             # layer -> version of that result
+        self._held = {}                  # layer -> (version, fn, args) held back until the drag pauses
+        self._settle_timer = QtCore.QTimer(self)
+        self._settle_timer.setSingleShot(True); self._settle_timer.setInterval(LAYER_SETTLE_MS)
+        self._settle_timer.timeout.connect(self._flush_layers)
 
         # Grips for table resize/move
         self.grip_size = 10
         self._build_grips()
 
+        # Static layer (table outline, pockets, grips) rasterized once per layout/color/lock change
+        self._static_pixmap = None
+
+        # Dirty-region repaints: area covered by the dynamic lines at the last paint
+        self._last_dynamic = QtGui.QRegion()
+        self.show_dirty_rects = os.environ.get("PF_DEBUG_DIRTY") == "1"
+
+        # Frame-paced input: keep only the latest cursor position, apply it once per frame tick
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh = round(screen.refreshRate()) if screen else 60
+        try: cap = int(os.environ.get("PF_FRAME_CAP", refresh))
+        except ValueError: cap = -1
+        self.frame_cap = cap if cap >= 0 else refresh          # bad PF_FRAME_CAP: follow the display
+        self._pending_move = None      # latest unapplied cursor position (QPointF)
+        self._last_frame = 0.0         # perf_counter() of the last applied move
+        self.coalesced_events = 0      # move events dropped because a newer one arrived first
+        self._frame_timer = QtCore.QTimer(self)
+        self._frame_timer.setSingleShot(True); self._frame_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._flush_move)
+
+        # Cursor prediction in carry mode (PF_PREDICT=1 or panel switch): the carried ball and its
+        # bank lines follow where the cursor is expected to be when the frame shows, not where the
+        # last move event was. Samples are event timestamps; stops, pick-ups, drops and pocket
+        # snaps start the history over.
+        self.predict_cursor = os.environ.get("PF_PREDICT") == "1"
+        self.predictor = predictor.CursorPredictor()
+        self._stop_timer = QtCore.QTimer(self)     # no move for STOP_MS: the cursor has stopped
+        self._stop_timer.setSingleShot(True); self._stop_timer.setInterval(int(predictor.STOP_MS))
+        self._stop_timer.timeout.connect(self._settle_prediction)
+
+        # Adaptive quality: while moves keep arriving (timer running) frames skip shadows,
+        # antialiasing and the snap ring; when it fires, one full-quality frame is painted.
+        #   quality     - full frames unless full frames measure over the frame budget mid-drag
+        #   balanced    - cheap frames during every drag
+        #   performance - cheap frames during drags, no shadows at rest either
+        self.quality = os.environ.get("PF_QUALITY", "balanced")
+        if self.quality not in QUALITY_PRESETS: self.quality = "balanced"
+        self._full_paint_ms = 0.0      # smoothed paint time of full-quality frames
+        self._interaction_timer = QtCore.QTimer(self)
+        self._interaction_timer.setSingleShot(True); self._interaction_timer.setInterval(INTERACTION_IDLE_MS)
+        self._interaction_timer.timeout.connect(self._update_dirty)
+
+        # Frame-time / input-latency instrumentation (PF_INSTRUMENT=1 or panel switch)
+        self.stats = None
+
+        # Raw input recorder (--record <file> / PF_RECORD=<file>), replayed headless by replay.py
+        self.recorder = None
+        if os.environ.get("PF_INSTRUMENT") == "1": self._set_instrumentation(True)
+
         # Snapping
         self.snap_enabled = True
         self.snap_thresh = 24.0
@@ -92,6 +190,15 @@ class Overlay(QtWidgets.QWidget):
         self.show_single_aim_line = True
         self.show_bank_shot = True
         self.show_double_bank_shot = True
+        self.show_bank_solutions = False
+        self.show_obstructions = True
+        self.show_physics = False
+        self.show_pocket_odds = False
+        self.use_pocket_index = False    # pocket odds from a precomputed (cell, angle) table instead of tracing
+
+        # Physics preview: simulated off the GUI thread at the fixed physics.DT substep (no frame
+        # budget to protect there), in PHYSICS_BUDGET_MS slices between cancellation checks.
+        self.shot_speed = 1.5                # m/s
 
         # Visuals
         self.line_thickness = 3
@@ -101,6 +208,9 @@ class Overlay(QtWidgets.QWidget):
         # Universal color
         self.color_universal = QtGui.QColor(255, 255, 255)  # white by default
 
+        # Pens memoized on (color, alpha, width, style); cleared when color/thickness/radius change
+        self._pen_cache = {}
+
         # Menu button
         self.menu_button = QtWidgets.QPushButton("☰", self)
         self.menu_button.setFixedSize(44, 44)
@@ -108,16 +218,43 @@ class Overlay(QtWidgets.QWidget):
         self.menu_button.move(40, 40)
         self.menu_button.clicked.connect(self._toggle_panel)
 
-        # Panel
-        self._build_panel()
+        # Profiles: all named layouts live in one file, held in memory and written atomically off-thread
+        self.profiles = ProfileStore(CONFIG_FILE)
+        self._autosave_timer = QtCore.QTimer(self)
+        self._autosave_timer.setSingleShot(True); self._autosave_timer.setInterval(AUTOSAVE_MS)
+        self._autosave_timer.timeout.connect(self._autosave)
 
-        # Load config if present
-        self.load_config()
+        # Panel: built on first open (O / ☰), not before the first frame
+        self.panel = None
+
+        # The config file is read and applied right after the first frame has been painted
+        self._config_loaded = False
+        self._startup_timer = QtCore.QTimer(self)
+        self._startup_timer.setSingleShot(True); self._startup_timer.setInterval(0)
+        self._startup_timer.timeout.connect(self._finish_startup)
 
         # Size
         self.resize(1200, 800)
+        STARTUP.mark("Overlay.__init__")
 
     # ---------------- Panel -----------------
+    def _ensure_panel(self):
+        if self.panel is None:
+            t0 = time.perf_counter(); self._build_panel()
+            STARTUP.add("panel build (first open)", time.perf_counter() - t0)
+        return self.panel
+
+    def _drop_panel(self):
+        # Widgets are created from current state: a hidden panel is rebuilt on next open, a visible
+        # one (e.g. after a switch from its own profile combo) right away, in the same place
+        if self.panel is None: return
+        visible, pos = self.panel.isVisible(), self.panel.pos()
+        self.panel.hide(); self.panel.deleteLater(); self.panel = None
+        if not visible: return
+        self._build_panel()
+        self.frame_cap_label.setText(f"Frame cap ({self.coalesced_events} moves coalesced)")
+        self.panel.adjustSize(); self.panel.move(pos); self.panel.raise_(); self.panel.show()
+
     def _build_panel(self):
         self.panel = QtWidgets.QFrame(self)
         self.panel.setFrameShape(QtWidgets.QFrame.Box)
@@ -126,26 +263,55 @@ class Overlay(QtWidgets.QWidget):
         v = QtWidgets.QVBoxLayout(self.panel)
         v.setContentsMargins(10,10,10,10); v.setSpacing(8)
 
-        v.addWidget(self._make_switch_row("6 hollow lines", True, lambda val: self._set_and_update('show_lines_to_pockets', val)))
-        v.addWidget(self._make_switch_row("Single aim line", True, lambda val: self._set_and_update('show_single_aim_line', val)))
-        v.addWidget(self._make_switch_row("Bank shot line", True, lambda val: self._set_and_update('show_bank_shot', val)))
-        v.addWidget(self._make_switch_row("Double bank shot line", True, lambda val: self._set_and_update('show_double_bank_shot', val)))
+        v.addWidget(self._make_switch_row("6 hollow lines", self.show_lines_to_pockets, lambda val: self._set_and_update('show_lines_to_pockets', val)))
+        v.addWidget(self._make_switch_row("Single aim line", self.show_single_aim_line, lambda val: self._set_and_update('show_single_aim_line', val)))
+        v.addWidget(self._make_switch_row("Bank shot line", self.show_bank_shot, lambda val: self._set_and_update('show_bank_shot', val)))
+        v.addWidget(self._make_switch_row("Double bank shot line", self.show_double_bank_shot, lambda val: self._set_and_update('show_double_bank_shot', val)))
+        v.addWidget(self._make_switch_row("Blocked legs", self.show_obstructions, lambda val: self._set_and_update('show_obstructions', val)))
+        v.addWidget(self._make_switch_row("Bank solver lines", self.show_bank_solutions, lambda val: self._set_and_update('show_bank_solutions', val)))
+        v.addWidget(self._make_switch_row("Physics preview", self.show_physics, lambda val: self._set_and_update('show_physics', val)))
+        v.addWidget(self._make_switch_row("Pocket odds (heat)", self.show_pocket_odds, lambda val: self._set_and_update('show_pocket_odds', val)))
+        v.addWidget(self._make_switch_row("Pocket odds lookup table", self.use_pocket_index, lambda val: self._set_and_update('use_pocket_index', val)))
+        v.addWidget(self._make_switch_row("Cursor prediction (carry)", self.predict_cursor, lambda val: self._set_and_update('predict_cursor', val)))
+        v.addWidget(self._make_switch_row("Show dirty rects (debug)", self.show_dirty_rects, lambda val: self._set_and_update('show_dirty_rects', val)))
+        v.addWidget(self._make_switch_row("Frame stats overlay", self.stats is not None, self._set_instrumentation))
 
         v.addLayout(self._make_slider_row("Line Thickness", 1, 10, self.line_thickness,
                                           lambda val: self._set_and_update('line_thickness', val)))
         v.addLayout(self._make_slider_row("Overlay Opacity", 30, 100, int(self.window_opacity*100),
                                           self._on_opacity_changed))
+        v.addLayout(self._make_slider_row("Shot Speed", 1, 16, int(round(self.shot_speed * 4)),
+                                          lambda val: self._set_and_update('shot_speed', val / 4.0)))
+
+        v.addLayout(self._make_combo_row(QtWidgets.QLabel("Quality"), [(q.capitalize(), q) for q in QUALITY_PRESETS],
+                                         self.quality, lambda val: self._set_and_update('quality', val)))
+
+        self.frame_cap_label = QtWidgets.QLabel("Frame cap")
+        v.addLayout(self._make_combo_row(self.frame_cap_label, [("Uncapped" if c == 0 else f"{c} fps", c) for c in FRAME_CAPS],
+                                         self.frame_cap, lambda val: self._set_and_update('frame_cap', val)))
 
         btn = QtWidgets.QPushButton("Set Line Color (All)")
         btn.clicked.connect(self._pick_universal_color)
         v.addWidget(btn)
 
+        cbtn = QtWidgets.QPushButton("Calibrate from Screenshot…")
+        cbtn.clicked.connect(self._pick_calibration_image)
+        v.addWidget(cbtn)
+
+        row_pf = QtWidgets.QHBoxLayout()
+        row_pf.addWidget(QtWidgets.QLabel("Profile"))
+        self.profile_combo = QtWidgets.QComboBox()
+        self._fill_profile_combo()
+        self.profile_combo.activated.connect(lambda i: self.switch_profile(self.profile_combo.itemText(i)))
+        nbtn = QtWidgets.QPushButton("New…"); nbtn.clicked.connect(self._new_profile)
+        row_pf.addWidget(self.profile_combo, 1); row_pf.addWidget(nbtn); v.addLayout(row_pf)
+
         row_sl = QtWidgets.QHBoxLayout()
         sbtn = QtWidgets.QPushButton("Save"); sbtn.clicked.connect(self.save_config)
         lbtn = QtWidgets.QPushButton("Load"); lbtn.clicked.connect(self.load_config)
         row_sl.addWidget(sbtn); row_sl.addWidget(lbtn); v.addLayout(row_sl)
 
-        v.addWidget(QtWidgets.QLabel("Shortcuts: O menu • Enter lock/unlock • Esc close • 1–6 send ball to pocket"))
+        v.addWidget(QtWidgets.QLabel("Shortcuts: O menu • Enter lock/unlock • Esc close • 1–6 send ball to pocket\nR rack/clear balls • N add ball at cursor • Del remove selected ball\nCtrl+S save • Ctrl+L reload • Ctrl+PgUp/PgDn switch profile"))
 
     def _make_switch_row(self, label, default, slot):
         cont = QtWidgets.QWidget(self.panel)
@@ -163,20 +329,46 @@ class Overlay(QtWidgets.QWidget):
         h.addWidget(s)
         return h
 
+    def _make_combo_row(self, label, items, val, slot):
+        h = QtWidgets.QHBoxLayout()
+        h.addWidget(label)
+        c = QtWidgets.QComboBox()
+        for text, data in items: c.addItem(text, data)
+        i = c.findData(val)
+        if i < 0: c.addItem(f"{val} fps", val); i = c.count()-1
+        c.setCurrentIndex(i); c.currentIndexChanged.connect(lambda i: slot(c.itemData(i)))
+        h.addWidget(c)
+        return h
+
     def _set_and_update(self, name, value):
-        setattr(self, name, value); self.update()
+        setattr(self, name, value)
+        if name in ('line_thickness', 'pocket_radius'): self._invalidate_styles()
+        self._refresh_scene(); self._schedule_autosave(); self.update()
+
+    def _set_instrumentation(self, on):
+        if on and self.stats is None: self.stats = FrameStats(csv_path=os.environ.get("PF_INSTRUMENT_CSV"))
+        elif not on and self.stats is not None: self.stats.close(); self.stats = None
+        self.update()
+
+    def _mark(self, section, t0):
+        # Charge the time since t0 to a stats section; returns now for chaining
+        now = time.perf_counter()
+        if self.stats is not None: self.stats.add(section, now - t0)
+        return now
 
     def _pick_universal_color(self):
         col = QtWidgets.QColorDialog.getColor(self.color_universal, self, "Choose Line Color")
         if col.isValid():
-            self.color_universal = col; self.update()
+            self.color_universal = col; self._invalidate_styles(); self._invalidate_static(); self._schedule_autosave(); self.update()
 
     def _on_opacity_changed(self, val: int):
         self.window_opacity = max(0.3, val / 100.0)
-        self.setWindowOpacity(self.window_opacity); self.update()
+        self.setWindowOpacity(self.window_opacity); self._schedule_autosave(); self.update()
 
     def _toggle_panel(self):
-        if self.panel.isVisible(): self.panel.hide(); return
+        if self.panel is not None and self.panel.isVisible(): self.panel.hide(); return
+        self._finish_startup(); self._ensure_panel()
+        self.frame_cap_label.setText(f"Frame cap ({self.coalesced_events} moves coalesced)")
         self.panel.adjustSize()
         pw, ph = self.panel.sizeHint().width(), self.panel.sizeHint().height()
         b = self.menu_button.geometry()
@@ -212,7 +404,7 @@ class Overlay(QtWidgets.QWidget):
         r = self.table_rect.normalized()
         if r.width() < 120: r.setWidth(120)
         if r.height() < 80: r.setHeight(80)
-        self.table_rect = r
+        self.table_rect = r; self._invalidate_static()
 
     def _clamp_to_window(self, p):
         x = min(max(p.x(), 0), self.width()); y = min(max(p.y(), 0), self.height())
@@ -223,7 +415,7 @@ class Overlay(QtWidgets.QWidget):
             x = min(max(p.x(), self.table_rect.left()), self.table_rect.right())
             y = min(max(p.y(), self.table_rect.top()), self.table_rect.bottom())
             return QtCore.QPointF(x, y)
-        self.p1 = clamp_point(self.p1); self.p2 = clamp_point(self.p2); self.marker = clamp_point(self.marker)
+        self.rack.clamp(*self._rect_ltrb()); self.marker = clamp_point(self.marker)
 
     def _resize_from_points(self, new_pos, anchor='TL'):
         r = QtCore.QRectF(self.table_rect); p = self._clamp_to_window(new_pos)
@@ -231,49 +423,169 @@ class Overlay(QtWidgets.QWidget):
         elif anchor == 'TR': r.setTopRight(p)
         elif anchor == 'BL': r.setBottomLeft(p)
         elif anchor == 'BR': r.setBottomRight(p)
-        self.table_rect = r.normalized(); self._keep_points_inside(); self.update()
+        old = self.table_rect; self.table_rect = r.normalized(); self._keep_points_inside(); self._update_table(old)
 
     def _resize_edge_left(self, p):
         p = self._clamp_to_window(p); r = QtCore.QRectF(self.table_rect); r.setLeft(p.x())
-        self.table_rect = r.normalized(); self._keep_points_inside(); self.update()
+        old = self.table_rect; self.table_rect = r.normalized(); self._keep_points_inside(); self._update_table(old)
     def _resize_edge_right(self, p):
         p = self._clamp_to_window(p); r = QtCore.QRectF(self.table_rect); r.setRight(p.x())
-        self.table_rect = r.normalized(); self._keep_points_inside(); self.update()
+        old = self.table_rect; self.table_rect = r.normalized(); self._keep_points_inside(); self._update_table(old)
     def _resize_edge_top(self, p):
         p = self._clamp_to_window(p); r = QtCore.QRectF(self.table_rect); r.setTop(p.y())
-        self.table_rect = r.normalized(); self._keep_points_inside(); self.update()
+        old = self.table_rect; self.table_rect = r.normalized(); self._keep_points_inside(); self._update_table(old)
     def _resize_edge_bottom(self, p):
         p = self._clamp_to_window(p); r = QtCore.QRectF(self.table_rect); r.setBottom(p.y())
-        self.table_rect = r.normalized(); self._keep_points_inside(); self.update()
-
-    # ------------- Pockets -------------
+        old = self.table_rect; self.table_rect = r.normalized(); self._keep_points_inside(); self._update_table(old)
+
+    # ------------- Balls -------------
+    @property
+    def p1(self) -> QtCore.QPointF: return QtCore.QPointF(*self.rack.get(0))
+    @p1.setter
+    def p1(self, p): self.rack.place(0, p.x(), p.y())
+
+    @property
+    def p2(self) -> QtCore.QPointF: return QtCore.QPointF(*self.rack.get(1))
+    @p2.setter
+    def p2(self, p): self.rack.place(1, p.x(), p.y())
+
+    @staticmethod
+    def _ball_key(i): return 'p1' if i == 0 else ('p2' if i == 1 else f'b{i}')
+    @staticmethod
+    def _ball_index(key): return 0 if key == 'p1' else (1 if key == 'p2' else int(key[1:]))
+
+    def ball(self, key) -> QtCore.QPointF:
+        return QtCore.QPointF(*self.rack.get(self._ball_index(key)))
+
+    def _set_ball(self, key, p: QtCore.QPointF):
+        self.rack.place(self._ball_index(key), p.x(), p.y())
+
+    def _has_ball(self, key):
+        i = self._ball_index(key)
+        return i < len(self.rack.active) and bool(self.rack.active[i])
+
+    def _ball_at(self, pos: QtCore.QPointF):
+        i = self.rack.hit(pos.x(), pos.y(), self.handle_radius)
+        return None if i is None else self._ball_key(i)
+
+    def _toggle_rack(self):
+        # Fill the table with a 15-ball triangle (p2 at the apex on the foot spot), or clear it again
+        if len(self.rack) > 2: self.rack.clear(keep=2)
+        else:
+            r = self.table_rect
+            apex = (r.left() + r.width()*0.75, r.center().y())
+            spots = triangle(apex, self.rack.radius + 0.5)
+            self.p2 = QtCore.QPointF(*spots[0])
+            for x, y in spots[1:]: self.rack.add(x, y)
+            self.rack.clamp(*self._rect_ltrb())
+        if not self._has_ball(self.last_target): self.last_target = 'p2'
+        self._refresh_scene(); self._schedule_autosave(); self.update()
+
+    # ------------- Pockets / scene -------------
     def pocket_centers(self):
-        r = self.table_rect
-        return [
-            QtCore.QPointF(r.left(), r.top()),
-            QtCore.QPointF(r.center().x(), r.top()),
-            QtCore.QPointF(r.right(), r.top()),
-            QtCore.QPointF(r.left(), r.bottom()),
-            QtCore.QPointF(r.center().x(), r.bottom()),
-            QtCore.QPointF(r.right(), r.bottom()),
-        ]
-
-    def _maybe_snap(self, p: QtCore.QPointF) -> QtCore.QPointF:
-        nearest, bestd = None, 1e9
-        for c in self.pocket_centers():
-            d = dist(p, c)
-            if d < bestd: bestd, nearest = d, c
-        return nearest if (nearest is not None and bestd <= self.snap_thresh) else p
-
-    def _nearest_pocket_if_close(self, pt: QtCore.QPointF, radius_factor=1.2):
-        # Returns (nearest_pocket_point, dist_to_it, base_snap_radius)
-        snap_r = self.pocket_radius * radius_factor
-        nearest, bestd = None, 1e9
-        for c in self.pocket_centers():
-            d = dist(pt, c)
-            if d < bestd:
-                bestd, nearest = d, c
-        return (nearest, bestd, snap_r)
+        _, pts = self.scene.pocket_index(self._rect_ltrb())
+        return [QtCore.QPointF(x, y) for x, y in pts]
+
+    def _nearest_pocket(self, p: QtCore.QPointF, r):
+        c, d = self.scene.nearest_pocket(self._rect_ltrb(), p.x(), p.y(), r)
+        return (None if c is None else QtCore.QPointF(*c)), d
+
+    def _maybe_snap(self, p: QtCore.QPointF, ball=None) -> QtCore.QPointF:
+        # Snap to a pocket when close; otherwise keep a carried ball out of the others (frozen contact)
+        nearest, _ = self._nearest_pocket(p, self.snap_thresh)
+        if nearest is not None: return nearest
+        if ball is None or len(self.rack) <= 1: return p
+        x, y = self.rack.resolve_overlap(self._ball_index(ball), p.x(), p.y())
+        return self._clamp_point_to_table(QtCore.QPointF(x, y))
+
+    def _refresh_scene(self):
+        # Advance the cached bank geometry / semi-lock for the current inputs (no-op if unchanged)
+        banks = 4 if self.show_double_bank_shot else (2 if self.show_bank_shot else 0)
+        if self.scene.refresh(self._rect_ltrb(), self.rack.get(0), self.rack.get(1),
+                              (self.marker.x(), self.marker.y()), banks, self.pocket_radius, self.corner_radius) and self.stats is not None:
+            self.stats.add('bank', self.scene.bank_s); self.stats.add('snap', self.scene.snap_s)
+        self._request_layers(banks)
+
+    # ------------- Analysis layers -------------
+    def _request_layers(self, banks):
+        # Snapshot the inputs of every enabled layer; unchanged snapshots are not resubmitted
+        rect, p1, p2, r = self._rect_ltrb(), self.rack.get(0), self.rack.get(1), self.pocket_radius
+        if self.show_bank_solutions:
+            n = 2 if self.show_double_bank_shot else 1
+            # Only paths that also drop through the cushions (jaws) as seen by the ball centre
+            model = self.scene.solver_model(rect, r, self.corner_radius)
+            self._request('solver', (rect, p1, n, r, self.corner_radius),
+                          lambda cancelled: model.confirm(p1, geo.solve_banks(p1, rect, n, ball_radius=r)))
+        else: self._drop_layer('solver')
+        if self.show_physics:
+            import physics
+            balls = self.rack.pos[self.rack.indices()]; m = (self.marker.x(), self.marker.y())
+            self._request('physics', (rect, balls.tobytes(), m, self.shot_speed, r), physics.run_shot,
+                          balls.copy(), m, rect, r, geo.pocket_centers(rect), self.shot_speed, physics.DT, PHYSICS_BUDGET_MS / 1e3)
+        else: self._drop_layer('physics')
+        # Pocket index: built (or loaded from the disk cache) per table size and pocket/corner
+        # radii; until it matches the current table the odds are traced exactly
+        index, rc = None, self.corner_radius
+        if self.show_pocket_odds and self.use_pocket_index:
+            import pocketindex
+            self._request('index', (pocketindex.table_size(rect), round(r, 1), round(rc, 1)), pocketindex.load_or_build,
+                          CACHE_DIR, rect, r, rc)
+            index = self._results.get('index')
+            if index is not None and not index.matches(rect, r, rc): index = None
+        else: self._drop_layer('index')
+        if self.show_pocket_odds and p1 != p2:
+            import montecarlo
+            # Traced through the cushions the bank line is drawn with, so the tint agrees with it
+            model = self.scene.cushion_model(rect, r, rc)
+            self._request('odds', (rect, p1, p2, max(1, banks), r, rc, index is not None), montecarlo.estimate,
+                          p2, (p2[0] - p1[0], p2[1] - p1[1]), rect, max(1, banks), r * 1.4, index=index, model=model)
+        else: self._drop_layer('odds')
+
+    def _request(self, layer, key, fn, *args, **kw):
+        if self._requests.get(layer, (None, None))[1] == key: return
+        if self.compute is None:
+            from compute import ComputeService
+            self.compute = ComputeService(parent=self); self.compute.resultReady.connect(self._on_result)
+        self._version += 1; self._requests[layer] = (self._version, key)
+        self.compute.cancel(layer)
+        job = functools.partial(fn, **kw) if kw else fn
+        # Mid-drag the workers would only compete with input handling for the GIL; wait for a pause
+        if self.carrying is not None or self.dragging_handle is not None:
+            self._held[layer] = (self._version, job, args); self._settle_timer.start()
+        else: self._held.pop(layer, None); self.compute.submit(layer, self._version, job, *args)
+
+    def _flush_layers(self):
+        held, self._held = self._held, {}
+        for layer, (version, fn, args) in held.items(): self.compute.submit(layer, version, fn, *args)
+
+    def _drop_layer(self, layer):
+        self._held.pop(layer, None)
+        if self._requests.pop(layer, None) is not None: self.compute.cancel(layer)
+        self._completed.pop(layer, None)
+        if self._results.pop(layer, None) is not None: self._update_dirty()
+
+    def layers_settled(self):
+        # Every requested layer has delivered its newest result (headless export waits on this)
+        return all(self._completed.get(layer) == v for layer, (v, _) in self._requests.items())
+
+    def _on_result(self, layer, version, result):
+        if self._requests.get(layer, (None,))[0] != version: return     # superseded after it finished
+        self._results[layer] = result; self._completed[layer] = version
+        if layer == 'physics' and self.stats is not None: self.stats.add('physics', result.elapsed)
+        if layer == 'index': self._refresh_scene(); return      # re-request the odds against the table
+        self._update_dirty()
+
+    def _draw_odds(self, painter: QtGui.QPainter):
+        # Heat tint per pocket: cold blue → hot red with the estimated probability
+        f = painter.font(); f.setPointSizeF(7); painter.setFont(f)
+        for c, p in zip(self.pocket_centers(), self._results['odds'][:6].tolist()):
+            if p < 0.005: continue
+            col = QtGui.QColor.fromHsvF(0.66 * (1 - p), 0.9, 1.0, 0.25 + 0.6 * p)
+            painter.setPen(QtCore.Qt.NoPen); painter.setBrush(col)
+            painter.drawEllipse(c, self.pocket_radius, self.pocket_radius)
+            painter.setPen(QtCore.Qt.white)
+            painter.drawText(QtCore.QRectF(c.x() - 20, c.y() + self.pocket_radius, 40, 12), QtCore.Qt.AlignCenter, f"{p:.0%}")
+        painter.setBrush(QtCore.Qt.NoBrush)
 
     def _clamp_point_to_table(self, p: QtCore.QPointF) -> QtCore.QPointF:
         x = min(max(p.x(), self.table_rect.left()), self.table_rect.right())
@@ -281,45 +593,85 @@ class Overlay(QtWidgets.QWidget):
         return QtCore.QPointF(x, y)
 
     # ------------- Bank math -------------
+    def _rect_ltrb(self):
+        r = self.table_rect
+        return (r.left(), r.top(), r.right(), r.bottom())
+
+    def _scene_segments(self):
+        return [(QtCore.QPointF(*a), QtCore.QPointF(*b)) for a, b in self.scene.segments]
+
     def _calculate_bank_shots(self, start_point, direction_x, direction_y, max_banks=2):
-        segments = []
-        current_pos = QtCore.QPointF(start_point)
-        vx, vy = direction_x, direction_y
-        for _ in range(max_banks):
-            r = self.table_rect; tvals = []
-            if vx > 0: tvals.append(((r.right()-current_pos.x())/vx, 'right'))
-            elif vx < 0: tvals.append(((r.left()-current_pos.x())/vx, 'left'))
-            if vy > 0: tvals.append(((r.bottom()-current_pos.y())/vy, 'bottom'))
-            elif vy < 0: tvals.append(((r.top()-current_pos.y())/vy, 'top'))
-            valid = [(t, side) for t,side in tvals if t and t > 0.001]
-            if not valid: break
-            t, side = min(valid, key=lambda x: x[0])
-            hit = QtCore.QPointF(current_pos.x()+vx*t, current_pos.y()+vy*t)
-            segments.append((QtCore.QPointF(current_pos), QtCore.QPointF(hit)))
-            if side in ('left','right'): vx = -vx
-            else: vy = -vy
-            current_pos = hit
-        return segments
+        model = self.scene.cushion_model(self._rect_ltrb(), self.pocket_radius, self.corner_radius)
+        legs = model.bank_segments((start_point.x(), start_point.y()), (direction_x, direction_y), max_banks)
+        return [(QtCore.QPointF(*a), QtCore.QPointF(*b)) for a, b in legs]
+
+    # ------------- Styles -------------
+    def _invalidate_styles(self):
+        self._pen_cache.clear()
+
+    def _pen(self, width, alpha=None, style=QtCore.Qt.SolidLine) -> QtGui.QPen:
+        c = self.color_universal
+        key = (c.rgb(), c.alpha() if alpha is None else alpha, width, style)
+        pen = self._pen_cache.get(key)
+        if pen is None:
+            col = QtGui.QColor(c); col.setAlpha(key[1])
+            pen = self._pen_cache[key] = QtGui.QPen(col, width, style, cap=QtCore.Qt.RoundCap)
+        return pen
+
+    def _blocker_pen(self) -> QtGui.QPen:
+        pen = self._pen_cache.get('blocker')
+        if pen is None: pen = self._pen_cache['blocker'] = QtGui.QPen(QtGui.QColor(255, 80, 80, 220), 2)
+        return pen
+
+    # ------------- Obstructions -------------
+    def _leg_obstructions(self, legs):
+        # One batched swept-circle test of every drawn leg against every ball on the table.
+        # A leg never collides with its own moving ball or with the ball it is aimed at.
+        if not legs: return None
+        idx = self.rack.indices()
+        t = time.perf_counter()
+        ignore = np.zeros((len(legs), len(idx)), dtype=bool)
+        for n, (_, _, _, mover, target, _) in enumerate(legs):
+            ignore[n] = (idx == mover) | (idx == target)
+        obs = geo.obstructions([(l[0].x(), l[0].y()) for l in legs], [(l[1].x(), l[1].y()) for l in legs],
+                               self.rack.pos[idx], self.rack.radius, ignore)
+        obs = obs._replace(blocker=np.where(obs.blocked, idx[np.maximum(obs.blocker, 0)], -1))
+        self._mark('obstruction', t)
+        return obs
+
+    # ------------- Physics preview -------------
+    def _draw_physics(self, painter: QtGui.QPainter, sim):
+        w = max(1, self.line_thickness - 1)
+        painter.setBrush(QtCore.Qt.NoBrush)
+        for i, path in enumerate(sim.paths):
+            if len(path) < 2: continue
+            painter.setPen(self._pen(w, 200, QtCore.Qt.DashLine) if i == 0 else self._pen(w if i == 1 else 1, 200 if i == 1 else 140))
+            painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in path]))
+        if sim.first_contact is not None:
+            painter.setPen(self._pen(1, 150))
+            painter.drawEllipse(QtCore.QPointF(*sim.first_contact[0]), self.pocket_radius, self.pocket_radius)
+        for i in sim.pocketed:
+            painter.setPen(self._pen(2, 220))
+            painter.drawEllipse(QtCore.QPointF(*sim.paths[i][-1]), self.pocket_radius * 0.6, self.pocket_radius * 0.6)
 
     # ------------- Shadows (soft + sized to circle) -------------
-    def _draw_shadow_line(self, painter: QtGui.QPainter, a: QtCore.QPointF, b: QtCore.QPointF):
+    def _add_shadow_line(self, batch: LineBatch, a: QtCore.QPointF, b: QtCore.QPointF):
         # Shadow thickness scales with circle size; keep it LIGHT (low alpha).
-        outer = max(2, int(self.pocket_radius))
-        inner = max(2, int(self.pocket_radius * 0.6))
-        pen1 = QtGui.QPen(QtGui.QColor(self.color_universal.red(),
-                                       self.color_universal.green(),
-                                       self.color_universal.blue(), 30),
-                          outer, cap=QtCore.Qt.RoundCap)
-        pen2 = QtGui.QPen(QtGui.QColor(self.color_universal.red(),
-                                       self.color_universal.green(),
-                                       self.color_universal.blue(), 70),
-                          inner, cap=QtCore.Qt.RoundCap)
-        painter.setPen(pen1); painter.drawLine(a, b)
-        painter.setPen(pen2); painter.drawLine(a, b)
-
-    # ------------- Painting -------------
-    def paintEvent(self, e: QtGui.QPaintEvent):
-        painter = QtGui.QPainter(self); painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        batch.add(self._pen(max(2, int(self.pocket_radius)), 30), a, b)
+        batch.add(self._pen(max(2, int(self.pocket_radius * 0.6)), 70), a, b)
+
+    # ------------- Static layer -------------
+    def _invalidate_static(self):
+        self._static_pixmap = None
+
+    def _static_layer(self) -> QtGui.QPixmap:
+        dpr = self.devicePixelRatioF()
+        pm = self._static_pixmap
+        if pm is not None and pm.devicePixelRatio() == dpr and pm.size() == self.size() * dpr:
+            return pm
+        pm = QtGui.QPixmap(self.size() * dpr); pm.setDevicePixelRatio(dpr)
+        pm.fill(QtCore.Qt.transparent)
+        painter = QtGui.QPainter(pm); painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
 
         # Table outline
         painter.setPen(self.border_pen); painter.setBrush(QtCore.Qt.NoBrush)
@@ -331,106 +683,241 @@ class Overlay(QtWidgets.QWidget):
         for c in self.pocket_centers():
             painter.drawEllipse(c, self.pocket_radius, self.pocket_radius)
 
+        # Grips (only when unlocked)
+        if not self.locked:
+            painter.setBrush(QtCore.Qt.white); painter.setPen(QtCore.Qt.NoPen)
+            for g in self.grips:
+                gp = g.pos_getter()
+                r = QtCore.QRectF(gp.x()-self.grip_size/2, gp.y()-self.grip_size/2, self.grip_size, self.grip_size)
+                painter.drawRoundedRect(r, 2, 2)
+
+        painter.end()
+        self._static_pixmap = pm
+        return pm
+
+    # ------------- Dirty regions -------------
+    def _segment_region(self, a: QtCore.QPointF, b: QtCore.QPointF, pad: float, step=64.0) -> QtGui.QRegion:
+        # Chain of small padded boxes along a→b, so a diagonal doesn't dirty its whole bounding box
+        n = max(1, int(math.ceil(dist(a, b) / step)))
+        reg = QtGui.QRegion()
+        for i in range(n):
+            p = a + (b - a) * (i / n); q = a + (b - a) * ((i + 1) / n)
+            reg = reg.united(QtCore.QRectF(p, q).normalized().adjusted(-pad, -pad, pad, pad).toAlignedRect())
+        return reg
+
+    def _dynamic_region(self) -> QtGui.QRegion:
+        # Everything paintEvent draws on top of the static layer: marker lines, aim line,
+        # bank segments, handles and the snap highlight around the bank endpoint's pocket.
+        pad = max(self.pocket_radius, self.line_thickness + 1) / 2.0 + 2
+        ring = self.pocket_radius + 4
+        segs, circles = [], [(self.p1, ring), (self.p2, ring)]
+        if self.carrying is not None: circles.append((self.ball(self.carrying), ring))
+        if self.show_obstructions:
+            circles += [(QtCore.QPointF(x, y), ring) for x, y in self.rack.pos[self.rack.indices()[2:]].tolist()]
+        if self.show_lines_to_pockets:
+            segs += [(self.marker, c) for c in self.pocket_centers()]; circles.append((self.marker, ring + self.line_thickness))
+        if self.show_single_aim_line or self.show_bank_shot or self.show_double_bank_shot: segs.append((self.p1, self.p2))
+        segs += self._scene_segments()
+        if self.scene.highlight is not None: circles.append((QtCore.QPointF(*self.scene.highlight), ring + 3))
+        if self.show_pocket_odds: circles += [(c, ring + 14) for c in self.pocket_centers()]
+
+        reg = QtGui.QRegion()
+        for a, b in segs: reg = reg.united(self._segment_region(a, b, pad))
+        for c, rad in circles: reg = reg.united(QtCore.QRectF(c.x()-rad, c.y()-rad, 2*rad, 2*rad).toAlignedRect())
+        if self.show_bank_solutions or self.show_physics: reg = reg.united(self.table_rect.adjusted(-pad, -pad, pad, pad).toAlignedRect())
+        if self.stats is not None: reg = reg.united(self._stats_rect().toAlignedRect())
+        return reg
+
+    def _update_dirty(self, extra: QtGui.QRegion = None):
+        # Repaint the union of where the dynamic lines were and where they are now
+        self._refresh_scene()
+        new = self._dynamic_region()
+        dirty = new.united(self._last_dynamic)
+        if extra is not None: dirty = dirty.united(extra)
+        self._last_dynamic = new
+        self.update(dirty)
+
+    def _update_table(self, old: QtCore.QRectF):
+        # Table moved/resized: static layer changes over the old and new table areas
+        self._invalidate_static()
+        m = self.pocket_radius + self.grip_size + 4
+        self._update_dirty(QtGui.QRegion(old.united(self.table_rect).adjusted(-m, -m, m, m).toAlignedRect()))
+
+    # ------------- Painting -------------
+    def _cheap_frame(self):
+        # Interaction is in progress when a move was applied within the idle timeout
+        if not self._interaction_timer.isActive() or (self.carrying is None and self.dragging_handle is None): return False
+        if self.quality != "quality": return True
+        return self._full_paint_ms > 1000.0 / (self.frame_cap or 60)    # full frames do not fit the budget
+
+    def paintEvent(self, e: QtGui.QPaintEvent):
+        if self.stats is not None: self.stats.begin_frame()
+        t_paint = time.perf_counter()
+        self._refresh_scene()          # normally a no-op: input handling already refreshed it
+        cheap = self._cheap_frame()
+        shadows = not cheap and self.quality != "performance"
+        painter = QtGui.QPainter(self); painter.setRenderHint(QtGui.QPainter.Antialiasing, not cheap)
+
+        # Table outline, pockets and grips come from the cached static layer
+        painter.drawPixmap(0, 0, self._static_layer())
+
+        # A full repaint (toggles, sliders, hotkeys) resets what the next partial update must erase
+        if e.rect() == self.rect(): self._last_dynamic = self._dynamic_region()
+
+        # Lines are collected per style (shadow passes first, then lines) and flushed in one go
+        batch, rings = LineBatch(), []
+        line_pen = self._pen(self.line_thickness)
+        bank_pen = self._pen(max(2, self.line_thickness+1))
+        pockets = self.pocket_centers()
+        legs = []                      # (a, b, pen, mover ball, target ball, chain id) — drawn with shadow
+
         # 6 hollow lines (marker → pockets) with soft shadow
         if self.show_lines_to_pockets:
-            for c in self.pocket_centers(): self._draw_shadow_line(painter, self.marker, c)
-            painter.setPen(QtGui.QPen(self.color_universal, self.line_thickness, cap=QtCore.Qt.RoundCap))
-            painter.setBrush(QtCore.Qt.NoBrush)
-            painter.drawEllipse(self.marker, self.pocket_radius, self.pocket_radius)
-            for c in self.pocket_centers(): painter.drawLine(self.marker, c)
-
-        # Single aim line (p1 → p2) with shadow
-        if self.show_single_aim_line:
-            self._draw_shadow_line(painter, self.p1, self.p2)
-            painter.setPen(QtGui.QPen(self.color_universal, self.line_thickness, cap=QtCore.Qt.RoundCap))
-            painter.drawLine(self.p1, self.p2)
+            rings.append((line_pen, self.marker, self.pocket_radius))
+            legs += [(self.marker, c, line_pen, -1, -1, None) for c in pockets]
 
-        # Bank & Double-bank lines with shadow + semi-lock endpoint
+        # Single aim line (p1 → p2) with shadow; the bank lines' thicker first leg covers the
+        # same segment, so it is drawn once (one shadow) when both are on
         dx = self.p2.x() - self.p1.x(); dy = self.p2.y() - self.p1.y()
-        if (self.show_bank_shot or self.show_double_bank_shot) and (dx or dy):
-            length = math.hypot(dx, dy); vx, vy = dx/length, dy/length
-            max_banks = 4 if self.show_double_bank_shot else 2
+        banking = (self.show_bank_shot or self.show_double_bank_shot) and (dx or dy)
+        if self.show_single_aim_line and not banking:
+            legs.append((self.p1, self.p2, line_pen, 0, 1, None))
 
+        # Bank & Double-bank lines with shadow + semi-lock endpoint
+        if banking:
             # First leg (p1 -> p2)
-            self._draw_shadow_line(painter, self.p1, self.p2)
-            painter.setPen(QtGui.QPen(self.color_universal, max(2, self.line_thickness+1), cap=QtCore.Qt.RoundCap))
-            painter.drawLine(self.p1, self.p2)
-
-            # Compute banks
-            segments = self._calculate_bank_shots(self.p2, vx, vy, max_banks)
-
-            # --- Semi-lock with hysteresis on FINAL endpoint ---
-            base_snap_r = self.pocket_radius * 1.4   # stickier by default
-            lock_r = base_snap_r                      # lock-in distance
-            unlock_r = base_snap_r * 2.2              # release distance
-
-            if segments:
-                s_last, e_last = segments[-1]
-                nearest, d_last, _ = self._nearest_pocket_if_close(e_last, radius_factor=lock_r / self.pocket_radius)
-
-                # If we were snapped previously, keep it until far enough
-                if self._snap_active and self._snap_endpoint is not None:
-                    d_keep = dist(e_last, self._snap_endpoint)
-                    if d_keep <= unlock_r:
-                        # stay snapped
-                        segments[-1] = (s_last, QtCore.QPointF(self._snap_endpoint))
-                        nearest = self._snap_endpoint
-                    else:
-                        # release
-                        self._snap_active = False
-                        self._snap_endpoint = None
-                        nearest = None
-
-                # If not already snapped, try to lock in
-                if not self._snap_active and nearest is not None and d_last <= lock_r:
-                    self._snap_active = True
-                    self._snap_endpoint = QtCore.QPointF(nearest)
-                    segments[-1] = (s_last, QtCore.QPointF(self._snap_endpoint))
-
-                # Draw a subtle highlight when snapped/near
-                highlight = self._snap_endpoint if self._snap_active else (nearest if (nearest is not None and d_last <= lock_r) else None)
-                if highlight is not None:
-                    painter.setPen(QtGui.QPen(self.color_universal, 1))
-                    painter.setBrush(QtCore.Qt.NoBrush)
-                    painter.drawEllipse(highlight, self.pocket_radius + 3, self.pocket_radius + 3)
-
-            # Render segments (shadow + line) once
-            for s, e2 in segments:
-                self._draw_shadow_line(painter, s, e2)
-                painter.setPen(QtGui.QPen(self.color_universal, max(2, self.line_thickness+1), cap=QtCore.Qt.RoundCap))
-                painter.drawLine(s, e2)
+            legs.append((self.p1, self.p2, bank_pen, 0, 1, None))
+
+            # Banks and the semi-locked endpoint come from the scene model (updated on input)
+            segments = self._scene_segments()
+            if self.scene.highlight is not None and not cheap:
+                rings.append((self._pen(1), QtCore.QPointF(*self.scene.highlight), self.pocket_radius + 3))
+
+            # Segments (object ball p2 travelling the banks)
+            legs += [(s, e2, bank_pen, 1, -1, 'bank') for s, e2 in segments]
+
+        # Obstructions: legs blocked by another ball turn dashed from the first contact on
+        obs = self._leg_obstructions(legs) if self.show_obstructions else None
+        chain_blocked = set()
+        for n, (a, b, pen, _, _, chain) in enumerate(legs):
+            blocked = obs is not None and obs.blocked[n]
+            if chain in chain_blocked: cut = a
+            elif blocked:
+                cut = a + (b - a) * float(obs.t[n])
+                bx, by = self.rack.get(int(obs.blocker[n]))
+                rings.append((self._blocker_pen(), QtCore.QPointF(bx, by), self.pocket_radius + 3))
+                if chain is not None: chain_blocked.add(chain)
+            else: cut = None
+            if cut is None:
+                if shadows: self._add_shadow_line(batch, a, b)
+                batch.add(pen, a, b)
+            else:
+                if cut != a:
+                    if shadows: self._add_shadow_line(batch, a, cut)
+                    batch.add(pen, a, cut)
+                batch.add(self._pen(max(1, self.line_thickness), 110, QtCore.Qt.DashLine), cut, b)
+
+        batch.flush(painter)
+        painter.setBrush(QtCore.Qt.NoBrush)
+        for pen, c, rad in rings:
+            painter.setPen(pen); painter.drawEllipse(c, rad, rad)
+        if self.show_pocket_odds and 'odds' in self._results: self._draw_odds(painter)
+
+        # Physics preview: simulated cue (dashed) and object ball paths
+        if self.show_physics and 'physics' in self._results: self._draw_physics(painter, self._results['physics'])
+
+        # Bank solver paths from p1 (thin dashed, no shadow)
+        sol = self._results.get('solver') if self.show_bank_solutions else None
+        if sol is not None:
+            targets = geo.pocket_targets(self._rect_ltrb(), self.pocket_radius)
+            painter.setPen(self._pen(1, 140, QtCore.Qt.DashLine))
+            for i in range(len(sol.pocket)):
+                pts = [self.p1] + [QtCore.QPointF(x, y) for x, y in sol.hits[i, :sol.cushions[i]].tolist()]
+                pts.append(QtCore.QPointF(*targets[sol.pocket[i]].tolist()))
+                painter.drawPolyline(QtGui.QPolygonF(pts))
 
         # Handles (bigger, hollow)
         painter.setBrush(QtCore.Qt.NoBrush)
         painter.setPen(QtGui.QPen(QtCore.Qt.white, 2))
         painter.drawEllipse(self.p1, self.pocket_radius, self.pocket_radius)
         painter.drawEllipse(self.p2, self.pocket_radius, self.pocket_radius)
-
-        # Grips (only when unlocked)
-        if not self.locked:
-            painter.setBrush(QtCore.Qt.white); painter.setPen(QtCore.Qt.NoPen)
-            for g in self.grips:
-                gp = g.pos_getter()
-                r = QtCore.QRectF(gp.x()-self.grip_size/2, gp.y()-self.grip_size/2, self.grip_size, self.grip_size)
-                painter.drawRoundedRect(r, 2, 2)
+        if len(self.rack) > 2:
+            painter.setPen(QtGui.QPen(QtGui.QColor(255, 255, 255, 170), 1.5))
+            for x, y in self.rack.pos[self.rack.indices()[2:]].tolist():
+                painter.drawEllipse(QtCore.QPointF(x, y), self.pocket_radius, self.pocket_radius)
+
+        # Debug: outline the dynamic region the next partial update will cover
+        if self.show_dirty_rects:
+            painter.setPen(QtGui.QPen(QtGui.QColor(255, 0, 0, 160), 1)); painter.setBrush(QtCore.Qt.NoBrush)
+            for r in self._last_dynamic.rects(): painter.drawRect(r.adjusted(0, 0, -1, -1))
+
+        if self.stats is not None:
+            self._draw_stats(painter)
+            painter.end(); self.stats.end_frame()
+        if not cheap: self._full_paint_ms += 0.2 * ((time.perf_counter() - t_paint) * 1e3 - self._full_paint_ms)
+        if not self._config_loaded: self._startup_timer.start()
+
+    def _stats_rect(self) -> QtCore.QRectF:
+        return QtCore.QRectF(10, self.height() - 78, 380, 68)
+
+    def _draw_stats(self, painter: QtGui.QPainter):
+        # Sparkline of paint time (frame budget as a dashed line) plus a one-line summary
+        r = self._stats_rect()
+        painter.setPen(QtCore.Qt.NoPen); painter.setBrush(QtGui.QColor(0, 0, 0, 170))
+        painter.drawRoundedRect(r, 6, 6)
+        paint = self.stats.series("paint_ms")
+        budget = 1000.0 / self.frame_cap if self.frame_cap else 1000.0 / 60
+        top = max([budget * 1.5] + paint)
+        g = r.adjusted(8, 22, -8, -6)
+        if paint:
+            step = g.width() / max(1, self.stats.samples.maxlen - 1)
+            pts = [QtCore.QPointF(g.left() + i*step, g.bottom() - g.height() * v / top) for i, v in enumerate(paint)]
+            painter.setPen(QtGui.QPen(QtGui.QColor(76, 217, 100), 1)); painter.drawPolyline(QtGui.QPolygonF(pts))
+        y = g.bottom() - g.height() * budget / top
+        painter.setPen(QtGui.QPen(QtGui.QColor(255, 80, 80, 200), 1, QtCore.Qt.DashLine))
+        painter.drawLine(QtCore.QPointF(g.left(), y), QtCore.QPointF(g.right(), y))
+        s = self.stats.summary()
+        f = painter.font(); f.setPointSizeF(8); painter.setFont(f); painter.setPen(QtCore.Qt.white)
+        painter.drawText(r.adjusted(8, 4, -8, 0), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop,
+                         f"paint {s['paint_p50']:.1f}/{s['paint_p95']:.1f} ms  lat {s['latency_p50']:.1f}/{s['latency_p95']:.1f} ms  ev/f {s['events_per_frame']:.1f}")
+
+    def closeEvent(self, e: QtGui.QCloseEvent):
+        if self.stats is not None: self.stats.close()
+        self.stop_recording()
+        if self._autosave_timer.isActive(): self._autosave_timer.stop(); self._autosave()
+        self.profiles.close()
+        if self.compute is not None: self.compute.shutdown()
+        super().closeEvent(e)
+
+    def resizeEvent(self, e: QtGui.QResizeEvent):
+        self._invalidate_static()
+        super().resizeEvent(e)
 
     # ------------- Input -------------
     def keyPressEvent(self, e: QtGui.QKeyEvent):
+        if self.recorder is not None: self._record("key", e)
+        if self.stats is not None: self.stats.input_event()
         if e.modifiers() & QtCore.Qt.ControlModifier and e.key() == QtCore.Qt.Key_S:
             self.save_config(); return
         if e.modifiers() & QtCore.Qt.ControlModifier and e.key() == QtCore.Qt.Key_L:
             self.load_config(); return
+        if e.modifiers() & QtCore.Qt.ControlModifier and e.key() in (QtCore.Qt.Key_PageUp, QtCore.Qt.Key_PageDown):
+            names = self.profiles.names()
+            if len(names) > 1:
+                i = names.index(self.profiles.active) if self.profiles.active in names else 0
+                self.switch_profile(names[(i + (1 if e.key() == QtCore.Qt.Key_PageDown else -1)) % len(names)])
+            return
 
         k = e.key()
         if k == QtCore.Qt.Key_O: self._toggle_panel(); return
         if k == QtCore.Qt.Key_Escape:
             # cancel carry if active
             if self.carrying is not None:
-                self.carrying = None
+                self.carrying = None; self.predictor.reset()
                 self.update()
                 return
             self.close(); return
-        if k in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter): self.locked = not self.locked; self.update(); return
+        if k in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter): self.locked = not self.locked; self._invalidate_static(); self._schedule_autosave(); self.update(); return
 
         # 1–6 hotkeys: send last-selected ball to that pocket
         key_to_index = {
@@ -441,12 +928,21 @@ class Overlay(QtWidgets.QWidget):
             idx = key_to_index[k]
             pockets = self.pocket_centers()
             if 0 <= idx < len(pockets):
-                target = pockets[idx]
-                if self.last_target == 'p1':
-                    self.p1 = QtCore.QPointF(target)
-                else:
-                    self.p2 = QtCore.QPointF(target)
-                self.update()
+                self._set_ball(self.last_target, QtCore.QPointF(pockets[idx]))
+                self._refresh_scene(); self._schedule_autosave(); self.update()
+            return
+
+        # Rack / add / remove balls
+        if k == QtCore.Qt.Key_R and self.carrying is None: self._toggle_rack(); return
+        if k == QtCore.Qt.Key_N:
+            pos = self._clamp_point_to_table(QtCore.QPointF(self.mapFromGlobal(QtGui.QCursor.pos())))
+            i = self.rack.add(pos.x(), pos.y())
+            if i is None: return
+            x, y = self.rack.resolve_overlap(i, pos.x(), pos.y()); self.rack.place(i, x, y); self.rack.clamp(*self._rect_ltrb())
+            self.last_target = self._ball_key(i); self._schedule_autosave(); self.update(); return
+        if k in (QtCore.Qt.Key_Delete, QtCore.Qt.Key_Backspace):
+            i = self._ball_index(self.last_target)
+            if i >= 2 and self.carrying != self.last_target: self.rack.remove(i); self.last_target = 'p2'; self._schedule_autosave(); self.update()
             return
 
         super().keyPressEvent(e)
@@ -455,31 +951,29 @@ class Overlay(QtWidgets.QWidget):
         return QtCore.QPointF(e.position() if hasattr(e, "position") else (e.localPos() if hasattr(e, "localPos") else e.pos()))
 
     def mousePressEvent(self, e: QtGui.QMouseEvent):
+        if self.recorder is not None: self._record("press", e)
+        if self.stats is not None: self.stats.input_event()
+        self._flush_move()
         pos = self._event_pos(e)
 
         # If carrying, a left click drops the ball at current cursor
         if self.carrying is not None and e.button() == QtCore.Qt.LeftButton:
             # Drop at current mouse position (respect bounds and optional snap)
             pt = self._clamp_point_to_table(pos)
-            if self.snap_enabled: pt = self._maybe_snap(pt)
-            if self.carrying == 'p1': self.p1 = pt
-            else: self.p2 = pt
-            self.carrying = None
-            self.update()
+            if self.snap_enabled: pt = self._maybe_snap(pt, self.carrying)
+            self._set_ball(self.carrying, pt)
+            self.carrying = None; self.predictor.reset()
+            self._refresh_scene(); self._schedule_autosave(); self.update()
             return
 
-        # If not carrying, a left click on p1/p2 picks it up (enter carry mode)
+        # If not carrying, a left click on a ball picks it up (enter carry mode)
         if e.button() == QtCore.Qt.LeftButton:
-            if dist(pos, self.p1) <= self.handle_radius:
-                self.carrying = 'p1'
-                self.last_target = 'p1'
-                self.carry_offset = pos - self.p1
-                self.update()
-                return
-            if dist(pos, self.p2) <= self.handle_radius:
-                self.carrying = 'p2'
-                self.last_target = 'p2'
-                self.carry_offset = pos - self.p2
+            key = self._ball_at(pos)
+            if key is not None:
+                self.carrying = key
+                self.last_target = key
+                self.carry_offset = pos - self.ball(key)
+                self.predictor.reset()
                 self.update()
                 return
 
@@ -498,34 +992,66 @@ class Overlay(QtWidgets.QWidget):
         super().mousePressEvent(e)
 
     def mouseMoveEvent(self, e: QtGui.QMouseEvent):
+        if self.recorder is not None: self._record("move", e)
+        if self.stats is not None: self.stats.input_event()
+        if self.carrying is None and self.dragging_handle is None:
+            super().mouseMoveEvent(e); return
         pos = self._event_pos(e)
-
+        if self.carrying is not None and self.predict_cursor:
+            self.predictor.add(e.timestamp(), pos.x(), pos.y()); self._stop_timer.start()
+        if not self.frame_cap: self._apply_move(pos); return
+
+        # Coalesce: only the newest position survives until the next frame tick
+        if self._pending_move is not None: self.coalesced_events += 1
+        self._pending_move = pos
+        if not self._frame_timer.isActive():
+            wait = self._last_frame + 1.0/self.frame_cap - time.perf_counter()
+            self._frame_timer.start(max(0, int(wait * 1000)))
+
+    def _flush_move(self):
+        self._frame_timer.stop()
+        if self._pending_move is None: return
+        pos, self._pending_move = self._pending_move, None
+        self._last_frame = time.perf_counter()
+        self._apply_move(pos)
+
+    def _settle_prediction(self):
+        # The cursor stopped: put the carried ball back under the last real cursor position
+        if self.carrying is None or not self.predictor.samples: return
+        _, x, y = self.predictor.samples[-1]; self.predictor.reset()
+        self._apply_move(QtCore.QPointF(x, y))
+
+    def _apply_move(self, pos: QtCore.QPointF):
+        self._interaction_timer.start()           # (re)arms the full-quality frame after the burst
         # If carrying, move selected ball with the cursor (no mouse button held)
         if self.carrying is not None:
+            if self.predict_cursor and self.predictor.samples:
+                pos = QtCore.QPointF(*self.predictor.predict(1000.0 / (self.frame_cap or 60)))   # one frame ahead
             p = pos - self.carry_offset
             p = self._clamp_point_to_table(p)
-            if self.snap_enabled: p = self._maybe_snap(p)
-            if self.carrying == 'p1': self.p1 = p
-            else: self.p2 = p
-            self.update()
+            if self.snap_enabled:
+                if self.predict_cursor and self._nearest_pocket(p, self.snap_thresh)[0] is not None: self.predictor.reset()
+                p = self._maybe_snap(p, self.carrying)
+            self._set_ball(self.carrying, p)
+            self._update_dirty()
             return
 
         # Legacy press-and-hold drag
         if self.dragging_handle == 'p1':
             self.p1 = self._clamp_point_to_table(pos)
-            if self.snap_enabled: self.p1 = self._maybe_snap(self.p1)
-            self.update(); return
+            if self.snap_enabled: self.p1 = self._maybe_snap(self.p1, 'p1')
+            self._update_dirty(); return
         if self.dragging_handle == 'p2':
             self.p2 = self._clamp_point_to_table(pos)
-            if self.snap_enabled: self.p2 = self._maybe_snap(self.p2)
-            self.update(); return
+            if self.snap_enabled: self.p2 = self._maybe_snap(self.p2, 'p2')
+            self._update_dirty(); return
         if self.dragging_handle == 'marker':
             self.marker = self._clamp_point_to_table(pos)
-            self.update(); return
+            self._update_dirty(); return
         if isinstance(self.dragging_handle, tuple):
             kind = self.dragging_handle[0]
             if kind == 'grip':
-                idx = self.dragging_handle[1]; self.grips[idx].pos_setter(pos); self._normalize_rect(); self.update(); return
+                old = QtCore.QRectF(self.table_rect); idx = self.dragging_handle[1]; self.grips[idx].pos_setter(pos); self._normalize_rect(); self._update_table(old); return
             if kind == 'table':
                 offset = self.dragging_handle[1]
                 new_tl = pos - offset
@@ -536,67 +1062,223 @@ class Overlay(QtWidgets.QWidget):
                 if moved.right() > self.width(): moved.translate(self.width()-moved.right(), 0)
                 if moved.bottom() > self.height(): moved.translate(0, self.height()-moved.bottom())
                 dp = QtCore.QPointF(moved.left()-self.table_rect.left(), moved.top()-self.table_rect.top())
-                self.table_rect = moved; self.p1 += dp; self.p2 += dp; self.marker += dp
-                self.update(); return
-
-        super().mouseMoveEvent(e)
+                old = self.table_rect
+                self.table_rect = moved; self.rack.translate(dp.x(), dp.y()); self.marker += dp
+                self._update_table(old); return
 
     def mouseReleaseEvent(self, e: QtGui.QMouseEvent):
         # Grab & Drop uses click-to-drop, so mouseRelease doesn't commit anything
+        if self.recorder is not None: self._record("release", e)
+        self._flush_move()
+        if self.dragging_handle is not None: self._schedule_autosave()
         self.dragging_handle = None
         super().mouseReleaseEvent(e)
 
+    # ------------- Recording -------------
+    def start_recording(self, path):
+        # The header keeps the current layout, so a replay starts from the same state
+        import inputlog
+        self.stop_recording()
+        self.recorder = inputlog.InputRecorder(path, self.width(), self.height(), self._config_dict(), time.perf_counter)
+        print("Recording input to", path)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close(); print(f"Recorded {self.recorder.count} input events"); self.recorder = None
+
+    def _record(self, name, e):
+        import inputlog                                                    # loaded by start_recording
+        kind = inputlog.KINDS[name]
+        if kind == inputlog.KEY:
+            p = QtCore.QPointF(self.mapFromGlobal(QtGui.QCursor.pos()))   # N adds a ball at the cursor
+            self.recorder.record(kind, p.x(), p.y(), key=e.key(), modifiers=int(e.modifiers()))
+        else:
+            p = self._event_pos(e)
+            self.recorder.record(kind, p.x(), p.y(), int(e.button()), int(e.buttons()), modifiers=int(e.modifiers()))
+
+    # ------------- Calibration -------------
+    def calibrate_from_file(self, path):
+        # `path` is a full-screen screenshot of the screen the overlay is on (device pixels)
+        import calibrate
+        try:
+            img = calibrate.read_image(path)
+            t0 = time.perf_counter(); cal = calibrate.find_table(img)
+        except (OSError, ValueError) as ex:
+            print("Calibration failed:", ex); return False
+        ms = (time.perf_counter() - t0) * 1e3
+        scr = (self.windowHandle().screen() if self.windowHandle() else None) or QtWidgets.QApplication.primaryScreen()
+        dpr = scr.devicePixelRatio(); origin = scr.geometry().topLeft()
+        def local(x, y): return QtCore.QPointF(self.mapFromGlobal(origin + QtCore.QPoint(round(x / dpr), round(y / dpr))))
+        l, t, r, b = cal.rect
+        old = self.table_rect
+        self.table_rect = QtCore.QRectF(local(l, t), local(r, b)).normalized()
+        self.corner_radius = max(0.0, cal.corner_radius / dpr)
+        self._keep_points_inside(); self._invalidate_static(); self._update_table(old); self._schedule_autosave()
+        print(f"Calibrated from {path} in {ms:.1f} ms: table {self.table_rect.getRect()}, corner radius {self.corner_radius:.1f}")
+        return True
+
+    def _pick_calibration_image(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Table screenshot", "", "Images (*.png *.jpg *.jpeg *.bmp)")
+        if path: self.calibrate_from_file(path)
+
     # ------------- Persist -------------
-    def save_config(self):
-        cfg = {
+    def _config_dict(self):
+        return {
             "table_rect": [self.table_rect.left(), self.table_rect.top(), self.table_rect.width(), self.table_rect.height()],
             "p1": [self.p1.x(), self.p1.y()],
             "p2": [self.p2.x(), self.p2.y()],
             "marker": [self.marker.x(), self.marker.y()],
             "last_target": self.last_target,
+            "balls": [[int(i)] + list(self.rack.get(i)) for i in self.rack.indices() if i >= 2],
             "toggles": {
                 "lines": self.show_lines_to_pockets,
                 "single": self.show_single_aim_line,
                 "bank": self.show_bank_shot,
-                "double_bank": self.show_double_bank_shot
+                "double_bank": self.show_double_bank_shot,
+                "solver": self.show_bank_solutions,
+                "obstructions": self.show_obstructions,
+                "physics": self.show_physics,
+                "odds": self.show_pocket_odds,
+                "odds_index": self.use_pocket_index
             },
-            "visuals": {"thickness": self.line_thickness, "opacity": self.window_opacity},
+            "corner_radius": self.corner_radius,
+            "visuals": {"thickness": self.line_thickness, "opacity": self.window_opacity, "frame_cap": self.frame_cap,
+                        "shot_speed": self.shot_speed, "quality": self.quality, "predict": self.predict_cursor},
             "color": [self.color_universal.red(), self.color_universal.green(), self.color_universal.blue(), self.color_universal.alpha()]
         }
-        try:
-            with open(CONFIG_FILE, "w") as f: json.dump(cfg, f, indent=2)
-            print("Config saved to", CONFIG_FILE)
-        except Exception as ex:
-            print("Save failed:", ex)
+
+    def _apply_config(self, cfg):
+        tr = cfg.get("table_rect")
+        if tr: self.table_rect = QtCore.QRectF(tr[0], tr[1], tr[2], tr[3])
+        p1 = cfg.get("p1"); p2 = cfg.get("p2"); m = cfg.get("marker")
+        if p1: self.p1 = QtCore.QPointF(p1[0], p1[1])
+        if p2: self.p2 = QtCore.QPointF(p2[0], p2[1])
+        if m: self.marker = QtCore.QPointF(m[0], m[1])
+        self.rack.clear(keep=2)
+        skipped = 0
+        for i, x, y in cfg.get("balls", []):
+            # Slots 0/1 are p1/p2; anything else outside the rack (or not a slot number) is dropped
+            if isinstance(i, int) and 2 <= i < MAX_BALLS: self.rack.place(i, x, y)
+            else: skipped += 1
+        if skipped: print(f"Skipped {skipped} ball(s) with a slot outside 2–{MAX_BALLS - 1}")
+        self.last_target = cfg.get("last_target", self.last_target)
+        if not self._has_ball(self.last_target): self.last_target = 'p2'
+        tgl = cfg.get("toggles", {})
+        self.show_lines_to_pockets = tgl.get("lines", self.show_lines_to_pockets)
+        self.show_single_aim_line = tgl.get("single", self.show_single_aim_line)
+        self.show_bank_shot = tgl.get("bank", self.show_bank_shot)
+        self.show_double_bank_shot = tgl.get("double_bank", self.show_double_bank_shot)
+        self.show_bank_solutions = tgl.get("solver", self.show_bank_solutions)
+        self.show_obstructions = tgl.get("obstructions", self.show_obstructions)
+        self.show_physics = tgl.get("physics", self.show_physics)
+        self.show_pocket_odds = tgl.get("odds", self.show_pocket_odds)
+        self.use_pocket_index = tgl.get("odds_index", self.use_pocket_index)
+        self.corner_radius = cfg.get("corner_radius", self.corner_radius)
+        vis = cfg.get("visuals", {})
+        self.line_thickness = vis.get("thickness", self.line_thickness)
+        self.frame_cap = vis.get("frame_cap", self.frame_cap)
+        self.shot_speed = vis.get("shot_speed", self.shot_speed)
+        self.quality = vis.get("quality", self.quality)
+        if self.quality not in QUALITY_PRESETS: self.quality = "balanced"
+        self.predict_cursor = vis.get("predict", self.predict_cursor)
+        self.window_opacity = vis.get("opacity", self.window_opacity); self.setWindowOpacity(self.window_opacity)
+        col = cfg.get("color")
+        if col: self.color_universal = QtGui.QColor(*(col if len(col)==4 else col+[255]))
+        self._drop_panel()
+        self._invalidate_styles(); self._invalidate_static(); self._refresh_scene(); self.update()
+
+    def save_config(self):
+        self._finish_startup(); self._autosave_timer.stop()
+        self.profiles.read_only = False                            # an explicit save may overwrite a bad file
+        self.profiles.put(self.profiles.active, self._config_dict()); self.profiles.save_async()
+        print(f"Config saved to {self.profiles.path} [{self.profiles.active}]")
 
     def load_config(self):
-        if not os.path.exists(CONFIG_FILE): return
+        # Re-apply the active profile from the in-memory index (the file is read once at startup)
+        if not self._config_loaded: self._finish_startup(); return
+        cfg = self.profiles.get()
+        if cfg is None: return
         try:
-            with open(CONFIG_FILE, "r") as f: cfg = json.load(f)
-            tr = cfg.get("table_rect")
-            if tr: self.table_rect = QtCore.QRectF(tr[0], tr[1], tr[2], tr[3])
-            p1 = cfg.get("p1"); p2 = cfg.get("p2"); m = cfg.get("marker")
-            if p1: self.p1 = QtCore.QPointF(p1[0], p1[1])
-            if p2: self.p2 = QtCore.QPointF(p2[0], p2[1])
-            if m: self.marker = QtCore.QPointF(m[0], m[1])
-            self.last_target = cfg.get("last_target", self.last_target)
-            tgl = cfg.get("toggles", {})
-            self.show_lines_to_pockets = tgl.get("lines", self.show_lines_to_pockets)
-            self.show_single_aim_line = tgl.get("single", self.show_single_aim_line)
-            self.show_bank_shot = tgl.get("bank", self.show_bank_shot)
-            self.show_double_bank_shot = tgl.get("double_bank", self.show_double_bank_shot)
-            vis = cfg.get("visuals", {})
-            self.line_thickness = vis.get("thickness", self.line_thickness)
-            self.window_opacity = vis.get("opacity", self.window_opacity); self.setWindowOpacity(self.window_opacity)
-            col = cfg.get("color")
-            if col: self.color_universal = QtGui.QColor(*(col if len(col)==4 else col+[255]))
-            print("Config loaded from", CONFIG_FILE); self.update()
-        except Exception as ex:
+            self._apply_config(cfg)
+            print(f"Config loaded from {self.profiles.path} [{self.profiles.active}]")
+        except (KeyError, TypeError, ValueError, IndexError) as ex:
             print("Load failed:", ex)
 
+    def _finish_startup(self):
+        # Deferred from __init__: read the profile file and apply the active layout (once)
+        if self._config_loaded: return
+        self._config_loaded = True; self._startup_timer.stop()
+        STARTUP.mark("first frame")
+        try: self.profiles.load()
+        except (OSError, ValueError) as ex:
+            print("Load failed:", ex)
+            bak = self.profiles.quarantine()
+            if bak: print(f"Unreadable config moved to {bak}; starting from defaults")
+            elif self.profiles.read_only: print("Autosave is off until the config is saved explicitly (Ctrl+S)")
+        self.load_config()
+        STARTUP.mark("load config")
+
+    def _schedule_autosave(self):
+        # Nothing is written before the saved layout has been read, or it would be overwritten
+        if self._config_loaded: self._autosave_timer.start()   # restarts the debounce window
+
+    def _autosave(self):
+        self.profiles.put(self.profiles.active, self._config_dict()); self.profiles.save_async()
+
+    # ------------- Profiles -------------
+    def switch_profile(self, name):
+        # Stash the current layout under the old name, then apply (or create) `name` — no disk I/O here
+        self._finish_startup()
+        if name == self.profiles.active: return
+        self._autosave_timer.stop()
+        self.profiles.put(self.profiles.active, self._config_dict())
+        self.profiles.select(name)
+        if self.profiles.get() is None: self.profiles.put(name, self._config_dict())
+        else: self._apply_config(self.profiles.get())
+        self.profiles.save_async(); self._fill_profile_combo()
+        print("Profile:", name)
+
+    def _new_profile(self):
+        name, ok = QtWidgets.QInputDialog.getText(self, "New profile", "Profile name:")
+        if ok and name.strip(): self.switch_profile(name.strip())
+
+    def _fill_profile_combo(self):
+        if self.panel is None: return
+        names = self.profiles.names() or [self.profiles.active]
+        if self.profiles.active not in names: names.append(self.profiles.active)
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear(); self.profile_combo.addItems(names)
+        self.profile_combo.setCurrentIndex(names.index(self.profiles.active))
+        self.profile_combo.blockSignals(False)
+
 def main():
-    app = QtWidgets.QApplication(sys.argv)
+    args = sys.argv[1:]
+    def opt(name): return args[args.index(name) + 1] if name in args[:-1] else None
+    if "--batch" in args:
+        # Headless: no QApplication, remaining arguments go to batch.py
+        import batch
+        i = args.index("--batch"); sys.exit(batch.main(args[:i] + args[i + 1:]))
+    if "--export" in args:
+        # Headless PNG export; the workers create their own offscreen QApplication
+        import export
+        i = args.index("--export"); sys.exit(export.main(args[:i] + args[i + 1:]))
+    profile = "--profile-startup" in args
+    shot = opt("--calibrate"); record = opt("--record") or os.environ.get("PF_RECORD")
+    app = QtWidgets.QApplication(sys.argv[:1])
+    STARTUP.mark("QApplication")
     w = Overlay(); w.resize(1200, 800); w.show()
+    STARTUP.mark("show")
+    if shot:
+        # After the saved layout is applied, so the fit wins over it
+        w._startup_timer.timeout.connect(lambda: w.calibrate_from_file(shot), QtCore.Qt.QueuedConnection)
+    if record:
+        w._startup_timer.timeout.connect(lambda: w.start_recording(record), QtCore.Qt.QueuedConnection)
+    if profile:
+        # Report once the deferred config load has run, time the lazy panel too, then exit
+        def report():
+            w._finish_startup(); w._ensure_panel()
+            print(STARTUP.report()); app.quit()
+        w._startup_timer.timeout.connect(report, QtCore.Qt.QueuedConnection)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
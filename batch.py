@@ -0,0 +1,123 @@
+# batch.py
+# Headless bank-shot solver for JSONL files of layouts (no Qt, no QApplication):
+#
+#   python batch.py layouts.jsonl [-o results.jsonl] [--workers N] [--chunk N]
+#   python aim.py --batch layouts.jsonl [...]      same thing from the overlay's entry point
+#
+# One scenario per input line:
+#   {"id": ..., "rect": [l, t, r, b], "balls": [[x, y], ...], "max_banks": 4,
+#    "pocket_radius": 14, "corner_radius": 0, "solver_cushions": 2}
+# balls[0] / balls[1] are p1 / p2, further balls are obstacles; everything but rect and the
+# first two balls is optional. Each line produces one output line, in input order:
+#   {"id": ..., "segments": [[[x0, y0], [x1, y1]], ...], "pocket": 0-5 or null,
+#    "blocked": [{"leg": n, "ball": k, "t": t}, ...],
+#    "solutions": [{"pocket", "cushions", "direction", "distance", "contacts"}, ...]}
+# or {"id": ..., "line": n, "error": "..."} for a scenario that cannot be solved (including a
+# rect with l >= r or t >= b). "blocked" lists the legs another ball is in the way of, like the
+# overlay's blocked legs: leg 0 is p1 -> p2, leg n >= 1 is segments[n - 1] (p2 travelling);
+# ball is the index into balls and t the fraction of the leg travelled at first contact.
+#
+# The segments and snapped pocket come from the same SceneModel the overlay paints from
+# (fresh per scenario, so no hysteresis carries over). Input is read in chunks of lines that
+# go to a process pool; at most two chunks per worker are in flight, so memory stays bounded
+# however long the file is.
+
+import os, sys, json, time, argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import geometry as geo
+from scene import SceneModel
+
+CHUNK = 256              # scenarios per pool task
+IN_FLIGHT = 2            # chunks queued per worker
+
+def solve(sc):
+    rect = tuple(float(v) for v in sc["rect"])
+    balls = [tuple(float(v) for v in p) for p in sc["balls"]]
+    if len(rect) != 4 or len(balls) < 2: raise ValueError("need rect [l, t, r, b] and at least two balls")
+    if rect[0] >= rect[2] or rect[1] >= rect[3]: raise ValueError("rect needs l < r and t < b")
+    p1, p2 = balls[0], balls[1]
+    radius = float(sc.get("pocket_radius", 14.0))
+    scene = SceneModel()
+    scene.refresh(rect, p1, p2, None, int(sc.get("max_banks", 4)), radius, float(sc.get("corner_radius", 0.0)))
+    pocket = scene.pockets.index(scene.snap_endpoint) if scene.snap_active else None
+    # Same legs and ignore rules as Overlay._leg_obstructions: a leg passes through its own ball and its target
+    legs = [(p1, p2)] + list(scene.segments)
+    ignore = np.zeros((len(legs), len(balls)), dtype=bool); ignore[0, :2] = True; ignore[1:, 1] = True
+    obs = geo.obstructions([a for a, _ in legs], [b for _, b in legs], balls, radius, ignore)
+    sol = geo.solve_banks(p1, rect, int(sc.get("solver_cushions", 2)), ball_radius=radius)
+    sol = scene.solver_model(rect, radius, float(sc.get("corner_radius", 0.0))).confirm(p1, sol)
+    return {
+        "id": sc.get("id"),
+        "segments": [[list(a), list(b)] for a, b in scene.segments],
+        "pocket": pocket,
+        "blocked": [{"leg": n, "ball": int(obs.blocker[n]), "t": float(obs.t[n])} for n in np.flatnonzero(obs.blocked).tolist()],
+        "solutions": [{"pocket": int(sol.pocket[i]), "cushions": int(sol.cushions[i]),
+                       "direction": sol.direction[i].tolist(), "distance": float(sol.distance[i]),
+                       "contacts": sol.hits[i, :sol.cushions[i]].tolist()} for i in range(len(sol.pocket))],
+    }
+
+def solve_chunk(first, lines):
+    # Worker task: raw lines in, (serialized result lines, error count) out
+    out, errors = [], 0
+    for n, line in enumerate(lines, first):
+        sc = None
+        try:
+            sc = json.loads(line)
+            out.append(json.dumps(solve(sc)))
+        except (ValueError, KeyError, TypeError, IndexError, AttributeError) as ex:
+            out.append(json.dumps({"id": sc.get("id") if isinstance(sc, dict) else None, "line": n, "error": str(ex)})); errors += 1
+    return out, errors
+
+def _chunks(f, size):
+    first, buf = 1, []
+    for n, line in enumerate(f, 1):
+        if not line.strip(): continue
+        if not buf: first = n
+        buf.append(line)
+        if len(buf) >= size: yield first, buf; buf = []
+    if buf: yield first, buf
+
+def run(src, dst, workers=None, chunk=CHUNK):
+    """Solve every scenario in the src file object into dst. Returns (scenarios, errors)."""
+    workers = workers or os.cpu_count() or 1
+    done = errors = 0
+    def emit(result):
+        nonlocal done, errors
+        lines, n_err = result
+        for line in lines: dst.write(line + "\n")
+        done += len(lines); errors += n_err
+    if workers == 1:
+        for first, lines in _chunks(src, chunk): emit(solve_chunk(first, lines))
+        return done, errors
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first, lines in _chunks(src, chunk):
+            pending.append(pool.submit(solve_chunk, first, lines))
+            if len(pending) >= workers * IN_FLIGHT: emit(pending.popleft().result())
+        while pending: emit(pending.popleft().result())
+    return done, errors
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Solve bank shots for a JSONL file of table layouts.")
+    ap.add_argument("input", help="JSONL scenarios ('-' for stdin)")
+    ap.add_argument("-o", "--out", help="JSONL results (default: stdout)")
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: all cores)")
+    ap.add_argument("--chunk", type=int, default=CHUNK, help="scenarios per pool task")
+    a = ap.parse_args(argv)
+    src = sys.stdin if a.input == "-" else open(a.input, "r")
+    dst = open(a.out, "w") if a.out else sys.stdout
+    t0 = time.perf_counter()
+    try:
+        done, errors = run(src, dst, a.workers or None, max(1, a.chunk))
+    finally:
+        if src is not sys.stdin: src.close()
+        if dst is not sys.stdout: dst.close()
+    dt = time.perf_counter() - t0
+    print(f"{done} scenarios, {errors} errors in {dt:.2f} s ({done / dt if dt else 0:.0f}/s)", file=sys.stderr)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
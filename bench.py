@@ -0,0 +1,180 @@
+# bench.py
+# Headless performance benchmarks for the overlay (Qt offscreen platform, no window shown).
+#
+#   python bench.py              run, compare against bench_baseline.json, exit 1 on regression
+#   python bench.py --update     run and (re)write the baseline
+#
+# Render scenarios draw Overlay.paintEvent into a QImage; micro benchmarks time the
+# geometry helpers and the screenshot calibration per call.
+# Results are JSON: {"metrics": {name: {value, unit, better}}}.
+
+import os, sys, json, time, argparse, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+import aim
+import geometry as geo
+import calibrate
+
+BASELINE_FILE = "bench_baseline.json"
+CALIBRATION_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "Bank shot line.png")
+
+def _overlay():
+    w = aim.Overlay()
+    w.resize(1200, 800)
+    return w
+
+def _image(w):
+    img = QtGui.QImage(w.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+    img.fill(QtCore.Qt.transparent)
+    return img
+
+_img_cache = {}
+
+def _fps(frames, step):
+    # step(i) mutates the scene for frame i and returns the widget to render
+    t0 = time.perf_counter()
+    for i in range(frames):
+        w = step(i)
+        img = _img_cache.get(id(w))
+        if img is None: img = _img_cache[id(w)] = _image(w)
+        w.render(img)
+    return frames / (time.perf_counter() - t0)
+
+# ------------- Render scenarios -------------
+def scene_idle(w):
+    return lambda i: w
+
+def scene_carry(w):
+    w.carrying = 'p1'; w.carry_offset = QtCore.QPointF(0, 0)
+    r = w.table_rect
+    def step(i):
+        t = (i % 100) / 100.0
+        w._apply_move(QtCore.QPointF(r.left() + r.width()*t, r.top() + r.height()*(0.2 + 0.6*t)))
+        return w
+    return step
+
+def scene_physics(w):
+    # Every frame moves the cue ball, so every frame supersedes the shot queued on the compute service
+    w.show_physics = True
+    w.marker = QtCore.QPointF(w.table_rect.right(), w.table_rect.top())
+    return scene_carry(w)
+
+def scene_resize(w):
+    w.dragging_handle = ('grip', 7)    # bottom-right grip
+    br = w.table_rect.bottomRight()
+    def step(i):
+        d = (i % 40) - 20
+        w._apply_move(QtCore.QPointF(br.x() + d, br.y() + d/2))
+        return w
+    return step
+
+def scene_toggles(on):
+    def setup(w):
+        w.show_lines_to_pockets = w.show_single_aim_line = on
+        w.show_bank_shot = w.show_double_bank_shot = w.show_bank_solutions = on
+        return scene_idle(w)
+    return setup
+
+def scene_thickness(px):
+    def setup(w):
+        w._set_and_update('line_thickness', px)
+        return scene_idle(w)
+    return setup
+
+SCENES = {
+    "idle": scene_idle,
+    "carry_drag": scene_carry,
+    "table_resize": scene_resize,
+    "physics_carry": scene_physics,
+    "all_toggles_on": scene_toggles(True),
+    "all_toggles_off": scene_toggles(False),
+    "thickness_1": scene_thickness(1),
+    "thickness_10": scene_thickness(10),
+}
+
+# ------------- Micro benchmarks -------------
+def _per_call_us(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n): fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+def micro(w, n):
+    p = QtCore.QPointF(w.table_rect.center())
+    near = QtCore.QPointF(w.table_rect.left() + 5, w.table_rect.top() + 5)
+    starts = geo.as_points([(p.x(), p.y())] * 1000)
+    dirs = geo.as_points([(1.0, 0.37)] * 1000)
+    shot = calibrate.read_image(CALIBRATION_FIXTURE)
+    return {
+        "calculate_bank_shots_us": _per_call_us(lambda: w._calculate_bank_shots(w.p2, 0.8, 0.6, 4), n),
+        "maybe_snap_us": _per_call_us(lambda: w._maybe_snap(near), n),
+        "pocket_centers_us": _per_call_us(w.pocket_centers, n),
+        "trace_banks_1000_rays_us": _per_call_us(lambda: geo.trace_banks(starts, dirs, w._rect_ltrb(), 4), max(1, n // 20)),
+        "calibrate_screenshot_us": _per_call_us(lambda: calibrate.find_table(shot), max(1, n // 200)),
+    }
+
+# ------------- Run / compare -------------
+def run(frames=200, calls=5000, repeat=3):
+    metrics = {}
+    for name, setup in SCENES.items():
+        best = 0.0
+        for _ in range(repeat):
+            w = _overlay(); step = setup(w)
+            best = max(best, _fps(frames, step))
+            _img_cache.clear(); w.deleteLater()
+        metrics[f"render_{name}_fps"] = {"value": best, "unit": "fps", "better": "higher"}
+    w = _overlay()
+    micro(w, 10)   # warm-up
+    best = {}
+    for _ in range(repeat):
+        for name, us in micro(w, calls).items(): best[name] = min(best.get(name, us), us)
+    for name, us in best.items():
+        metrics[name] = {"value": us, "unit": "us", "better": "lower"}
+    return {"meta": {"python": sys.version.split()[0], "qt": QtCore.QT_VERSION_STR,
+                     "platform": QtGui.QGuiApplication.platformName(), "frames": frames, "calls": calls},
+            "metrics": metrics}
+
+def compare(result, baseline, tolerance):
+    regressions = []
+    for name, m in result["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base: continue
+        if m["better"] == "higher": bad = m["value"] < base["value"] * (1 - tolerance)
+        else: bad = m["value"] > base["value"] * (1 + tolerance)
+        change = (m["value"] - base["value"]) / base["value"] * 100 if base["value"] else 0.0
+        print(f"{name:34s} {m['value']:12.2f} {m['unit']:3s}  baseline {base['value']:12.2f}  {change:+6.1f}%{'  REGRESSION' if bad else ''}")
+        if bad: regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless overlay benchmarks")
+    ap.add_argument("--baseline", default=BASELINE_FILE)
+    ap.add_argument("--update", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--calls", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="also write this run's results to a JSON file")
+    args = ap.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    # Never pick up a user's pf_config.json from the working directory
+    aim.CONFIG_FILE = os.path.join(tempfile.gettempdir(), "pf_bench_no_config.json")
+
+    result = run(args.frames, args.calls, args.repeat)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(result, f, indent=2)
+    if args.update or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as f: json.dump(result, f, indent=2)
+        for name, m in result["metrics"].items(): print(f"{name:34s} {m['value']:12.2f} {m['unit']}")
+        print("Baseline written to", args.baseline)
+        return 0
+    with open(args.baseline) as f: baseline = json.load(f)
+    regressions = compare(result, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed past {args.tolerance:.0%}:", ", ".join(regressions))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# calibrate.py
+# Qt-free table auto-calibration from a still screenshot:
+# - colour segmentation of the cloth on a strided, downsampled copy finds the playfield
+# - each edge is then refined at full resolution inside a narrow band (mask-coverage edge)
+# - pockets are the centroids of dark-red blobs just outside the corners / side midpoints
+# - the corner radius comes from where the cloth starts along each corner diagonal
+#
+# Images are (H, W, 3) uint8 RGB arrays; read_image() loads a file through QtGui for
+# convenience. `python calibrate.py assets/*.png` prints the fit and timing per image.
+
+import sys, math, time
+from collections import namedtuple
+
+import numpy as np
+import geometry as geo
+
+WORK_WIDTH = 480       # width of the downsampled copy used for the coarse pass
+COVERAGE = 0.5         # fraction of the peak row/column coverage that still counts as cloth
+
+Calibration = namedtuple("Calibration", "rect pockets corner_radius")
+
+def read_image(path) -> np.ndarray:
+    from PyQt5 import QtGui   # only needed for decoding; the fitting itself is NumPy
+    img = QtGui.QImage(path)
+    if img.isNull(): raise ValueError(f"cannot read image: {path}")
+    img = img.convertToFormat(QtGui.QImage.Format_RGB888)
+    a = np.frombuffer(img.constBits().asstring(img.sizeInBytes()), np.uint8)
+    return a.reshape(img.height(), img.bytesPerLine())[:, :img.width() * 3].reshape(img.height(), img.width(), 3)
+
+def cloth_mask(img) -> np.ndarray:
+    # Teal baize: green and blue clearly above red, close to each other, not neon-bright like the rails
+    r, g, b = (img[..., i].astype(np.int16) for i in range(3))
+    gr, br = g - r, b - r
+    return (gr > 12) & (gr < 75) & (br > 12) & (br < 90) & (np.abs(b - g) < 22)
+
+def pocket_mask(img) -> np.ndarray:
+    # Pocket holes are near-black with a red cast; the cushion shadows are near-black with a blue one
+    r, g, b = (img[..., i].astype(np.int16) for i in range(3))
+    return (np.maximum(np.maximum(r, g), b) < 45) & (r >= b)
+
+def _run(coverage, frac=COVERAGE):
+    # Contiguous run around the peak where coverage stays above frac * peak
+    peak = int(np.argmax(coverage)); on = coverage >= frac * coverage[peak]
+    lo = peak
+    while lo > 0 and on[lo - 1]: lo -= 1
+    hi = peak
+    while hi < len(on) - 1 and on[hi + 1]: hi += 1
+    return lo, hi
+
+def _edge(mask_band, axis, first):
+    # Index of the first (or last) row/column in a full-resolution band that is mostly cloth
+    cov = mask_band.mean(axis=axis); idx = np.flatnonzero(cov >= COVERAGE * max(cov.max(), 1e-9))
+    if not len(idx): return None
+    return int(idx[0] if first else idx[-1])
+
+def find_table(img, work_width=WORK_WIDTH) -> Calibration:
+    """Fit the playfield rect (left, top, right, bottom), six pocket centres and corner radius.
+
+    Raises ValueError if no cloth-coloured region is found.
+    """
+    img = np.asarray(img); h, w = img.shape[:2]
+    s = max(1, w // work_width)
+
+    # Coarse pass: strided copy, row/column coverage of the cloth mask
+    m = cloth_mask(img[::s, ::s])
+    if m.sum() < 0.02 * m.size: raise ValueError("no table cloth found")
+    y0, y1 = _run(m.sum(axis=1)); x0, x1 = _run(m[y0:y1 + 1].sum(axis=0))
+    l, t, r, b = x0 * s, y0 * s, x1 * s + s - 1, y1 * s + s - 1
+
+    # Fine pass: each edge inside a band of ±2 coarse cells, sampled over the middle half of the side
+    pad = 2 * s; qx, qy = (r - l) // 4, (b - t) // 4
+    def band(ya, yb, xa, xb):
+        ya, yb, xa, xb = max(0, ya), min(h, yb), max(0, xa), min(w, xb)
+        return cloth_mask(img[ya:yb, xa:xb]), ya, xa
+    bm, oy, _ = band(t - pad, t + pad, l + qx, r - qx); e = _edge(bm, 1, True); t = oy + e if e is not None else t
+    bm, oy, _ = band(b - pad, b + pad + 1, l + qx, r - qx); e = _edge(bm, 1, False); b = oy + e if e is not None else b
+    bm, _, ox = band(t + qy, b - qy, l - pad, l + pad); e = _edge(bm, 0, True); l = ox + e if e is not None else l
+    bm, _, ox = band(t + qy, b - qy, r - pad, r + pad + 1); e = _edge(bm, 0, False); r = ox + e if e is not None else r
+    rect = (float(l), float(t), float(r + 1), float(b + 1))
+
+    return Calibration(rect, _pockets(img, rect), _corner_radius(img, rect))
+
+def _pockets(img, rect):
+    # Centroid of the pocket-coloured pixels in a window just outside each corner / side midpoint
+    h, w = img.shape[:2]; l, t, r, b = rect
+    half = 0.08 * (b - t); out = []
+    for (px, py), (ox, oy) in zip(geo.pocket_centers(rect).tolist(),
+                                  [(-1, -1), (0, -1), (1, -1), (-1, 1), (0, 1), (1, 1)]):
+        cx, cy = px + ox * half * 0.5, py + oy * half * 0.5
+        xa, xb = int(max(0, cx - half)), int(min(w, cx + half)); ya, yb = int(max(0, cy - half)), int(min(h, cy + half))
+        pm = pocket_mask(img[ya:yb, xa:xb]) if xb > xa and yb > ya else None
+        if pm is None or pm.sum() < 0.05 * pm.size: out.append((px, py)); continue   # fall back to the geometric pocket
+        ys, xs = np.nonzero(pm)
+        out.append((xa + float(xs.mean()), ya + float(ys.mean())))
+    return out
+
+def _corner_radius(img, rect, limit=0.15):
+    # Along each corner diagonal the cloth starts at r * (1 - 1/√2) from the corner
+    h, w = img.shape[:2]; l, t, r, b = (int(round(v)) for v in rect)
+    n = int(limit * min(r - l, b - t)); radii = []
+    for cx, cy, dx, dy in ((l, t, 1, 1), (r - 1, t, -1, 1), (l, b - 1, 1, -1), (r - 1, b - 1, -1, -1)):
+        k = np.arange(n); xs = np.clip(cx + dx * k, 0, w - 1); ys = np.clip(cy + dy * k, 0, h - 1)
+        hit = np.flatnonzero(cloth_mask(img[ys, xs]))
+        if len(hit): radii.append(hit[0] / (1 - 1 / math.sqrt(2)))
+    return float(np.median(radii)) if radii else 0.0
+
+def main(argv=None):
+    for path in (argv if argv is not None else sys.argv[1:]):
+        img = read_image(path)
+        t0 = time.perf_counter(); cal = find_table(img); ms = (time.perf_counter() - t0) * 1e3
+        l, t, r, b = cal.rect
+        print(f"{path}: rect ({l:.0f}, {t:.0f}, {r:.0f}, {b:.0f})  corner_radius {cal.corner_radius:.1f}  {ms:.1f} ms")
+        print("  pockets", ", ".join(f"({x:.0f}, {y:.0f})" for x, y in cal.pockets))
+
+if __name__ == "__main__":
+    main()
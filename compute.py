@@ -0,0 +1,62 @@
+# compute.py
+# Background compute service for the overlay's analysis layers (bank solver, physics preview,
+# pocket odds):
+# - callers submit (layer, version, fn, *args) where args is an immutable scene snapshot
+# - per layer at most one job runs and one waits; a newer submit replaces the waiting one,
+#   and a running job sees cancelled() turn True so it can stop early
+# - finished results are posted back with the resultReady signal (queued onto the GUI thread)
+#
+# Jobs are plain functions: fn(*args, cancelled=callable) -> result, or None to drop it.
+
+import os, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+class ComputeService(QtCore.QObject):
+    resultReady = QtCore.pyqtSignal(str, int, object)     # layer, version, result
+
+    def __init__(self, workers=None, parent=None):
+        super().__init__(parent)
+        self.pool = ThreadPoolExecutor(max_workers=workers or min(2, os.cpu_count() or 1), thread_name_prefix="overlay-compute")
+        self._lock = threading.Lock()
+        self._latest = {}        # layer -> newest submitted version
+        self._running = set()    # layers with a job on the pool
+        self._waiting = {}       # layer -> (version, fn, args) queued behind the running job
+        self.dropped = 0         # superseded requests that never ran (or stopped early)
+
+    def submit(self, layer, version, fn, *args):
+        with self._lock:
+            self._latest[layer] = version
+            if layer in self._running:
+                if layer in self._waiting: self.dropped += 1
+                self._waiting[layer] = (version, fn, args); return
+            self._running.add(layer)
+        self.pool.submit(self._run, layer, version, fn, args)
+
+    def is_stale(self, layer, version):
+        return self._latest.get(layer) != version
+
+    def _run(self, layer, version, fn, args):
+        try:
+            if not self.is_stale(layer, version):
+                result = fn(*args, cancelled=lambda: self.is_stale(layer, version))
+                if result is not None and not self.is_stale(layer, version): self.resultReady.emit(layer, version, result)
+                else: self.dropped += 1
+        except Exception as ex:
+            print(f"Compute job '{layer}' failed:", ex)
+        finally:
+            with self._lock:
+                nxt = self._waiting.pop(layer, None)
+                if nxt is None: self._running.discard(layer)
+            if nxt is not None: self.pool.submit(self._run, layer, *nxt)
+
+    def cancel(self, layer):
+        # Whatever is queued or running for `layer` will not report
+        with self._lock:
+            self._latest[layer] = None; self._waiting.pop(layer, None)
+
+    def shutdown(self):
+        with self._lock:
+            self._latest.clear(); self._waiting.clear()
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,235 @@
+# cushions.py
+# Qt-free polygonal cushion model for the drawn bank lines:
+# - the rail outline is the table's rounded rect (corner arcs as short chords)
+# - each pocket cuts a mouth out of the outline; the cut ends get jaws angled into the pocket,
+#   and a drop line across the jaw tips closes the outline
+# - rays reflect off rails, arcs and jaws and stop when they cross a drop line (pocketed)
+# - a corner mouth is centred on the outline point nearest the corner (the middle of a rounded
+#   corner's arc), so it always reaches the rail however round the corner is
+#
+# Segments are bucketed in a uniform grid and rays walk it cell by cell (Amanatides–Woo), so a
+# reflection only tests the few segments in the cells the ray passes through; the cost follows
+# the ray's length in cells, not the number of segments. first_drops() is the batched form for
+# the pocket odds and the pocket index: every ray against every segment in NumPy, same result
+# as trace() ray by ray.
+
+import math
+import numpy as np
+import geometry as geo
+
+ARC_STEPS = 6            # chords per rounded corner
+CORNER_MOUTH = 2.0       # corner pocket mouth: outline cut within this × pocket radius of the corner's outline point
+SIDE_MOUTH = 1.6         # side pocket mouth: half-width × pocket radius
+CORNER_JAW_DEG = 38.0    # jaw turn from the rail line toward the pocket (a 142° corner jaw)
+SIDE_JAW_DEG = 76.0      # (a 104° side jaw)
+JAW_LEN = 1.5            # jaw length × pocket radius
+GRID_CELLS = 16          # grid cells along the longer table side
+BATCH = 8192             # rays per NumPy pass in first_drops
+RAIL = -1                # kind of a reflecting segment; drop lines carry their pocket index
+EPS = 1e-6
+
+class SegmentGrid:
+    def __init__(self, segments, cell):
+        self.seg = segments                          # list of (ax, ay, bx, by)
+        self.cell = float(cell)
+        xs = [v for s in segments for v in (s[0], s[2])]; ys = [v for s in segments for v in (s[1], s[3])]
+        self.x0, self.y0 = min(xs) - 1.0, min(ys) - 1.0
+        self.nx = max(1, math.ceil((max(xs) + 1.0 - self.x0) / self.cell))
+        self.ny = max(1, math.ceil((max(ys) + 1.0 - self.y0) / self.cell))
+        self.cells = {}                              # (cx, cy) -> segment ids
+        for i, (ax, ay, bx, by) in enumerate(segments):
+            # Conservative: every cell of the segment's bounding box
+            cx0, cy0 = self._key(min(ax, bx), min(ay, by)); cx1, cy1 = self._key(max(ax, bx), max(ay, by))
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1): self.cells.setdefault((cx, cy), []).append(i)
+
+    def _key(self, x, y):
+        return (int((x - self.x0) // self.cell), int((y - self.y0) // self.cell))
+
+    def _hit(self, i, px, py, dx, dy):
+        # Ray parameter t of the hit on segment i, or None
+        ax, ay, bx, by = self.seg[i]
+        ex, ey = bx - ax, by - ay
+        den = dx * ey - dy * ex
+        if abs(den) < 1e-12: return None
+        wx, wy = ax - px, ay - py
+        t = (wx * ey - wy * ex) / den; u = (wx * dy - wy * dx) / den
+        return t if t > EPS and -EPS <= u <= 1 + EPS else None
+
+    def first_hit(self, px, py, dx, dy, skip=-1):
+        """(t, segment id) of the nearest segment along p + t·d, or (inf, -1)."""
+        cx, cy = self._key(px, py)
+        if not (0 <= cx < self.nx and 0 <= cy < self.ny): return self._brute(px, py, dx, dy, skip)
+        sx = 1 if dx > 0 else -1; sy = 1 if dy > 0 else -1
+        inf = math.inf
+        tmx = ((self.x0 + (cx + (sx > 0)) * self.cell - px) / dx) if dx else inf
+        tmy = ((self.y0 + (cy + (sy > 0)) * self.cell - py) / dy) if dy else inf
+        tdx = self.cell / abs(dx) if dx else inf; tdy = self.cell / abs(dy) if dy else inf
+        best, best_i = inf, -1
+        while 0 <= cx < self.nx and 0 <= cy < self.ny:
+            for i in self.cells.get((cx, cy), ()):
+                if i == skip: continue
+                t = self._hit(i, px, py, dx, dy)
+                if t is not None and t < best: best, best_i = t, i
+            if best <= min(tmx, tmy) + EPS: break    # nothing in later cells can be closer
+            if tmx < tmy: cx += sx; tmx += tdx
+            else: cy += sy; tmy += tdy
+        return best, best_i
+
+    def _brute(self, px, py, dx, dy, skip):
+        best, best_i = math.inf, -1
+        for i in range(len(self.seg)):
+            if i == skip: continue
+            t = self._hit(i, px, py, dx, dy)
+            if t is not None and t < best: best, best_i = t, i
+        return best, best_i
+
+class CushionModel:
+    def __init__(self, rect, pocket_radius, corner_radius=0.0):
+        self.rect = rect
+        segs, kinds = _build(rect, pocket_radius, corner_radius)
+        self.segments = segs                         # (ax, ay, bx, by) per segment
+        self.kinds = kinds                           # RAIL or pocket index 0–5
+        l, t, r, b = rect
+        self.grid = SegmentGrid(segs, max(r - l, b - t, 1.0) / GRID_CELLS)
+
+    def trace(self, start, direction, max_banks):
+        """(points, pocket): start, every cushion contact (up to max_banks) and, if the path drops,
+        the point where it crosses the drop line; pocket is that pocket's index or None."""
+        px, py = float(start[0]), float(start[1])
+        n = math.hypot(direction[0], direction[1])
+        if n == 0: return [(px, py)], None
+        dx, dy = direction[0] / n, direction[1] / n
+        pts = [(px, py)]; last = -1
+        for _ in range(max_banks):
+            t, i = self.grid.first_hit(px, py, dx, dy, last)
+            if i < 0: break                          # escaped through a gap (should not happen)
+            px, py = px + dx * t, py + dy * t; pts.append((px, py))
+            if self.kinds[i] != RAIL: return pts, self.kinds[i]
+            ax, ay, bx, by = self.segments[i]
+            ex, ey = bx - ax, by - ay; el = math.hypot(ex, ey)
+            nx_, ny_ = -ey / el, ex / el
+            d = dx * nx_ + dy * ny_
+            dx, dy = dx - 2 * d * nx_, dy - 2 * d * ny_; last = i
+        return pts, None
+
+    def first_drops(self, starts, directions, max_banks):
+        """Batched trace(): per ray the pocket it drops into (0–5, or 6 for none) and the cushion
+        contacts before the drop (-1 for none). `starts` is one point or one per ray."""
+        d = geo.as_points(directions).astype(float); n = len(d)
+        p = np.broadcast_to(geo.as_points(starts).astype(float), (n, 2)).copy()
+        pocket = np.full(n, 6); leg = np.full(n, -1)
+        for k in range(0, n, BATCH):
+            pocket[k:k + BATCH], leg[k:k + BATCH] = self._drops(p[k:k + BATCH], d[k:k + BATCH], max_banks)
+        return pocket, leg
+
+    def _drops(self, p, d, max_banks):
+        seg = np.asarray(self.segments, dtype=float); kinds = np.asarray(self.kinds)
+        a, e = seg[:, :2], seg[:, 2:] - seg[:, :2]                       # (S, 2)
+        nrm = np.stack([-e[:, 1], e[:, 0]], axis=1) / np.hypot(e[:, 0], e[:, 1])[:, None]
+        n = len(p); d = d / np.maximum(np.hypot(d[:, 0], d[:, 1]), 1e-300)[:, None]
+        pocket = np.full(n, 6); leg = np.full(n, -1)
+        live = np.flatnonzero(np.hypot(d[:, 0], d[:, 1]) > 0); last = np.full(n, -1)
+        for b in range(max_banks):
+            if not len(live): break
+            pl, dl = p[live], d[live]
+            den = dl[:, None, 0] * e[None, :, 1] - dl[:, None, 1] * e[None, :, 0]     # (L, S)
+            wx = a[None, :, 0] - pl[:, None, 0]; wy = a[None, :, 1] - pl[:, None, 1]
+            safe = np.where(np.abs(den) < 1e-12, 1.0, den)
+            t = (wx * e[None, :, 1] - wy * e[None, :, 0]) / safe
+            u = (wx * dl[:, None, 1] - wy * dl[:, None, 0]) / safe
+            ok = (np.abs(den) >= 1e-12) & (t > EPS) & (u >= -EPS) & (u <= 1 + EPS)
+            prev = last[live]; rows = np.flatnonzero(prev >= 0); ok[rows, prev[rows]] = False   # not the one just left
+            t = np.where(ok, t, np.inf)
+            i = t.argmin(axis=1); ti = t[np.arange(len(live)), i]
+            hit = np.isfinite(ti)                                        # misses escaped (should not happen)
+            live, i, ti = live[hit], i[hit], ti[hit]
+            p[live] += d[live] * ti[:, None]
+            drop = kinds[i] != RAIL
+            pocket[live[drop]] = kinds[i[drop]]; leg[live[drop]] = b
+            live, i = live[~drop], i[~drop]
+            dn = (d[live] * nrm[i]).sum(axis=1)
+            d[live] -= 2 * dn[:, None] * nrm[i]; last[live] = i
+        return pocket, leg
+
+    def confirm(self, start, sol):
+        """The geometry.solve_banks paths from `start` that also drop into their pocket here,
+        after exactly their cushion count (no extra jaw contact). Use a model with the solver's
+        rail convention (SceneModel.solver_model: rails inset by the ball radius), or the
+        retraced contacts are not the ones the solver draws."""
+        keep = [i for i in range(len(sol.pocket))
+                if self.trace(start, sol.direction[i], int(sol.cushions[i]) + 1)[1] == int(sol.pocket[i])]
+        return geo.BankSolutions(*(f[keep] for f in sol))
+
+    def bank_segments(self, start, direction, max_banks=2):
+        # Same shape as geometry.bank_segments: list of ((x0, y0), (x1, y1)) legs
+        pts, _ = self.trace(start, direction, max_banks)
+        return list(zip(pts[:-1], pts[1:]))
+
+# ------------- Construction -------------
+def _outline(rect, rc):
+    # Clockwise (on screen) rounded-rect polyline, closed (first point repeated)
+    l, t, r, b = rect
+    rc = max(0.0, min(rc, (r - l) / 2, (b - t) / 2))
+    pts = []
+    for cx, cy, a0 in ((r - rc, t + rc, -90), (r - rc, b - rc, 0), (l + rc, b - rc, 90), (l + rc, t + rc, 180)):
+        steps = ARC_STEPS if rc > 0 else 0
+        for k in range(steps + 1):
+            a = math.radians(a0 + 90 * k / max(steps, 1))
+            pts.append((cx + rc * math.cos(a), cy + rc * math.sin(a)))
+    pts.append(pts[0])
+    return pts
+
+def _circle_cuts(a, b, c, rad):
+    # Segment parameters in (0, 1) where a→b crosses the circle (c, rad)
+    dx, dy = b[0] - a[0], b[1] - a[1]; fx, fy = a[0] - c[0], a[1] - c[1]
+    A = dx * dx + dy * dy; B = 2 * (fx * dx + fy * dy); C = fx * fx + fy * fy - rad * rad
+    disc = B * B - 4 * A * C
+    if A == 0 or disc <= 0: return []
+    s = math.sqrt(disc)
+    return sorted(u for u in ((-B - s) / (2 * A), (-B + s) / (2 * A)) if 0 < u < 1)
+
+def _mouth_centres(rect, rc):
+    # Pocket centres, with the corners moved onto the middle of their (rounded) corner arc
+    l, t, r, b = rect
+    rc = max(0.0, min(rc, (r - l) / 2, (b - t) / 2)); k = rc * (1 - math.sqrt(0.5))
+    pts = geo.pocket_centers(rect).tolist()
+    for i, (sx, sy) in ((0, (1, 1)), (2, (-1, 1)), (3, (1, -1)), (5, (-1, -1))):
+        pts[i] = [pts[i][0] + sx * k, pts[i][1] + sy * k]
+    return pts
+
+def _build(rect, pocket_radius, corner_radius):
+    pockets = _mouth_centres(rect, corner_radius)
+    mouth = [pocket_radius * (SIDE_MOUTH if i in (1, 4) else CORNER_MOUTH) for i in range(6)]
+    def inside(p):
+        for i, c in enumerate(pockets):
+            if math.hypot(p[0] - c[0], p[1] - c[1]) < mouth[i]: return i
+        return -1
+
+    # Outline pieces outside every mouth
+    pieces = []
+    line = _outline(rect, corner_radius)
+    for a, b in zip(line[:-1], line[1:]):
+        us = sorted({u for i, c in enumerate(pockets) for u in _circle_cuts(a, b, c, mouth[i])})
+        knots = [a] + [(a[0] + (b[0] - a[0]) * u, a[1] + (b[1] - a[1]) * u) for u in us] + [b]
+        for p, q in zip(knots[:-1], knots[1:]):
+            if math.hypot(q[0] - p[0], q[1] - p[1]) < EPS: continue
+            if inside(((p[0] + q[0]) / 2, (p[1] + q[1]) / 2)) < 0: pieces.append((p, q))
+
+    # Jaws at the cut ends: turn from the rail direction (into the mouth) outward by the jaw angle
+    segs = [(p[0], p[1], q[0], q[1]) for p, q in pieces]; kinds = [RAIL] * len(segs)
+    tips = {}                                        # pocket -> jaw tips
+    for p, q in pieces:
+        tx, ty = q[0] - p[0], q[1] - p[1]; tl = math.hypot(tx, ty); tx, ty = tx / tl, ty / tl
+        ox, oy = ty, -tx                             # outward normal of a clockwise outline (screen coords)
+        for cut, sgn in ((q, 1.0), (p, -1.0)):      # the mouth lies ahead of q and behind p
+            near = [i for i, c in enumerate(pockets) if abs(math.hypot(cut[0] - c[0], cut[1] - c[1]) - mouth[i]) < 1e-6]
+            if not near: continue
+            i = near[0]; a = math.radians(SIDE_JAW_DEG if i in (1, 4) else CORNER_JAW_DEG)
+            jx, jy = sgn * tx * math.cos(a) + ox * math.sin(a), sgn * ty * math.cos(a) + oy * math.sin(a)
+            tip = (cut[0] + jx * JAW_LEN * pocket_radius, cut[1] + jy * JAW_LEN * pocket_radius)
+            segs.append((cut[0], cut[1], tip[0], tip[1])); kinds.append(RAIL)
+            tips.setdefault(i, []).append(tip)
+    for i, pts in tips.items():
+        if len(pts) == 2: segs.append((pts[0][0], pts[0][1], pts[1][0], pts[1][1])); kinds.append(i)
+    return segs, kinds
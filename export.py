@@ -0,0 +1,145 @@
+# export.py
+# Headless PNG export of the overlay for a batch of saved configurations (Qt offscreen platform):
+#
+#   python export.py pf_config.json layouts/*.json -o shots/ [--workers N] [--size 1200x800]
+#   python aim.py --export pf_config.json [...]      same thing from the overlay's entry point
+#
+# Every input is either a profile file (one image per profile, <file>_<profile>.png) or a
+# single saved layout (<file>.png). Unreadable files and malformed layouts are reported per
+# file / layout (and counted as errors) without stopping the run; layouts are type-checked in
+# the parent before they reach a worker, since a bad value would only fail inside paintEvent. Each image is what paintEvent draws for that layout: table,
+# pockets, marker and aim lines, bank lines and any analysis layer the layout switches on
+# (rendered once its background result has arrived).
+#
+# Jobs fan out over a process pool. Every worker starts its own offscreen QApplication with one
+# Overlay and one QImage buffer, and reuses both for all of its jobs; the user's pf_config.json
+# is never read or written.
+
+import os, re, sys, json, time, argparse, tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from rack import MAX_BALLS
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+LAYER_TIMEOUT_S = 30.0   # longest wait for analysis layers (a pocket index build takes ~13 s)
+POINTS = {"p1": 2, "p2": 2, "marker": 2, "table_rect": 4}    # numeric list fields and their lengths
+NUMBERS = ("thickness", "opacity", "frame_cap", "shot_speed")  # numeric visuals
+
+_worker = None           # per-process (app, overlay, image, defaults, background, timeout)
+
+def jobs(paths, out_dir):
+    # (name, config, png path, error) for every layout in the input files; error is None for a
+    # usable layout, else the file or layout is skipped with that message
+    for path in paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, "r") as f: data = json.load(f)
+        except (OSError, ValueError) as ex:
+            yield stem, None, None, f"cannot read {path}: {ex}"; continue
+        if isinstance(data, dict) and isinstance(data.get("profiles"), dict): layouts = data["profiles"].items()
+        else: layouts = [(None, data)]
+        for name, cfg in layouts:
+            label = stem if name is None else f"{stem}_{name}"
+            yield label, cfg, os.path.join(out_dir, re.sub(r"[^\w.-]+", "_", label) + ".png"), check_layout(cfg)
+
+def _num(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and v == v
+
+def check_layout(cfg):
+    """None if _apply_config and paintEvent can take cfg, else what is wrong with it."""
+    if not isinstance(cfg, dict): return f"layout is a {type(cfg).__name__}, not an object"
+    for key, n in POINTS.items():
+        v = cfg.get(key)
+        if v is not None and not (isinstance(v, list) and len(v) == n and all(map(_num, v))): return f"{key} must be {n} numbers"
+    balls = cfg.get("balls", [])
+    if not isinstance(balls, list) or not all(isinstance(b, list) and len(b) == 3 and all(map(_num, b)) for b in balls):
+        return "balls must be [index, x, y] entries"
+    if not all(isinstance(b[0], int) and 2 <= b[0] < MAX_BALLS for b in balls): return f"ball index must be an integer 2-{MAX_BALLS - 1}"
+    if not re.fullmatch(r"p1|p2|b\d+", str(cfg.get("last_target", "p2"))): return "last_target must be p1, p2 or b<n>"
+    tgl = cfg.get("toggles", {})
+    if not isinstance(tgl, dict) or not all(isinstance(v, bool) for v in tgl.values()): return "toggles must be true/false"
+    if not _num(cfg.get("corner_radius", 0)): return "corner_radius must be a number"
+    vis = cfg.get("visuals", {})
+    if not isinstance(vis, dict): return "visuals must be an object"
+    for key in NUMBERS:
+        if not _num(vis.get(key, 0)): return f"visuals.{key} must be a number"
+    if not isinstance(vis.get("frame_cap", 0), int): return "visuals.frame_cap must be an integer"
+    if not isinstance(vis.get("quality", ""), str) or not isinstance(vis.get("predict", False), bool): return "visuals.quality / predict have the wrong type"
+    col = cfg.get("color")
+    if col is not None and not (isinstance(col, list) and len(col) in (3, 4) and all(isinstance(c, int) and 0 <= c <= 255 for c in col)):
+        return "color must be 3 or 4 integers 0-255"
+    return None
+
+def _init_worker(size, background, timeout):
+    global _worker
+    from PyQt5 import QtGui, QtWidgets
+    import aim
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    aim.CONFIG_FILE = os.path.join(tempfile.mkdtemp(prefix="pf_export_"), "pf_config.json")
+    w = aim.Overlay(); w.resize(*size); w._finish_startup()
+    img = QtGui.QImage(size[0], size[1], QtGui.QImage.Format_ARGB32_Premultiplied)
+    bg = QtGui.QColor(0, 0, 0, 0) if background == "transparent" else QtGui.QColor(background)
+    _worker = (app, w, img, w._config_dict(), bg, timeout)
+
+def render_job(job):
+    """Worker task: (label, png path, ms, error or None)."""
+    label, cfg, out, _ = job
+    app, w, img, defaults, bg, timeout = _worker
+    t0 = time.perf_counter()
+    try:
+        w._apply_config(defaults); w._apply_config(cfg)     # defaults first: nothing leaks between jobs
+        deadline = t0 + timeout
+        while not w.layers_settled() and time.perf_counter() < deadline:
+            app.processEvents(); time.sleep(0.001)
+        img.fill(bg); w.render(img)
+        err = None if img.save(out) else "could not write image"
+    except (KeyError, TypeError, ValueError, IndexError, AttributeError) as ex:
+        err = f"bad layout: {ex}"
+    except MemoryError:
+        err = "bad layout: out of memory"
+    return label, out, (time.perf_counter() - t0) * 1e3, err
+
+def run(paths, out_dir, workers=None, size=(1200, 800), background="#14462a", timeout=LAYER_TIMEOUT_S):
+    """Render every layout; returns (images written, errors)."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    init = (tuple(size), background, timeout)
+    done = errors = 0
+    def report(res):
+        nonlocal done, errors
+        label, out, ms, err = res
+        if err: errors += 1; print(f"{label}: {err}")
+        else: done += 1; print(f"{out}  {ms:.0f} ms")
+    def valid():
+        # Bad files / layouts are reported here in the parent; only usable layouts go to workers
+        for job in jobs(paths, out_dir):
+            if job[3] is None: yield job
+            else: report((job[0], job[2], 0.0, job[3]))
+    if workers == 1:
+        _init_worker(*init)
+        for job in valid(): report(render_job(job))
+        return done, errors
+    # spawn: every worker starts clean and creates its own QApplication
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=init) as pool:
+        for res in pool.map(render_job, valid(), chunksize=4): report(res)
+    return done, errors
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render saved overlay layouts to PNG images (headless).")
+    ap.add_argument("inputs", nargs="+", help="profile files (pf_config.json) or single saved layouts")
+    ap.add_argument("-o", "--out", default="export", help="output directory")
+    ap.add_argument("--workers", type=int, default=0, help="processes (default: all cores)")
+    ap.add_argument("--size", default="1200x800", help="image size WxH (the overlay window size)")
+    ap.add_argument("--background", default="#14462a", help="fill colour behind the overlay, or 'transparent'")
+    ap.add_argument("--layer-timeout", type=float, default=LAYER_TIMEOUT_S, help="max seconds to wait for analysis layers")
+    a = ap.parse_args(argv)
+    size = tuple(int(v) for v in a.size.lower().split("x"))
+    t0 = time.perf_counter()
+    done, errors = run(a.inputs, a.out, a.workers or None, size, a.background, a.layer_timeout)
+    dt = time.perf_counter() - t0
+    print(f"{done} images, {errors} errors in {dt:.2f} s")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
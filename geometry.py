@@ -0,0 +1,165 @@
+# geometry.py
+# Qt-free table geometry used by the overlay (and anything that runs without a widget):
+# - pocket centres for a table rect
+# - vectorized cushion reflection for many rays at once
+#
+# Rects are plain (left, top, right, bottom) tuples, points/directions are (x, y)
+# pairs or (N, 2) arrays. Nothing in here imports PyQt.
+
+from collections import namedtuple
+
+import numpy as np
+
+EPS = 0.001   # minimum travel before a ray may hit a cushion again
+
+def as_points(a) -> np.ndarray:
+    return np.asarray(a, dtype=float).reshape(-1, 2)
+
+def pocket_centers(rect) -> np.ndarray:
+    # Same order as Overlay.pocket_centers / hotkeys 1–6: top L, M, R, then bottom L, M, R
+    l, t, r, b = rect; cx = (l + r) / 2.0
+    return np.array([(l, t), (cx, t), (r, t), (l, b), (cx, b), (r, b)], dtype=float)
+
+def trace_banks(starts, directions, rect, max_banks=2):
+    """Reflect N rays off the cushions of `rect`.
+
+    Returns (hits, valid): hits is (N, max_banks, 2) with the k-th cushion contact of
+    every ray, valid is (N, max_banks) and False once a ray has stopped (zero direction).
+    A ray that reaches a corner exactly reflects off the side cushion first, like the
+    original per-ray loop did.
+    """
+    pos = as_points(starts).copy(); vel = as_points(directions).copy()
+    if len(pos) == 1 and len(vel) > 1: pos = np.repeat(pos, len(vel), axis=0)
+    n = len(pos); l, t, r, b = rect
+    hits = np.zeros((n, max_banks, 2)); valid = np.zeros((n, max_banks), dtype=bool)
+    alive = np.ones(n, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in range(max_banks):
+            vx, vy = vel[:, 0], vel[:, 1]
+            tx = np.where(vx > 0, (r - pos[:, 0]) / vx, np.where(vx < 0, (l - pos[:, 0]) / vx, np.inf))
+            ty = np.where(vy > 0, (b - pos[:, 1]) / vy, np.where(vy < 0, (t - pos[:, 1]) / vy, np.inf))
+            tx[~(tx > EPS)] = np.inf; ty[~(ty > EPS)] = np.inf
+            side_x = tx <= ty
+            tt = np.minimum(tx, ty)
+            alive &= np.isfinite(tt)
+            if not alive.any(): break
+            pos[alive] += vel[alive] * tt[alive, None]
+            hits[alive, k] = pos[alive]; valid[alive, k] = True
+            vel[alive & side_x, 0] *= -1; vel[alive & ~side_x, 1] *= -1
+    return hits, valid
+
+def bank_segments(start, direction, rect, max_banks=2):
+    # Single-ray convenience wrapper: list of ((x0, y0), (x1, y1)) legs
+    hits, valid = trace_banks(start, direction, rect, max_banks)
+    pts = [tuple(p) for p in as_points(start)[:1].tolist() + hits[0][valid[0]].tolist()]
+    return list(zip(pts[:-1], pts[1:]))
+
+# ------------- Mirror-image bank solver -------------
+BankSolutions = namedtuple("BankSolutions", "pocket cushions direction distance hits")
+
+def inset_rect(rect, d):
+    # Rails as seen by a ball centre of radius d
+    l, t, r, b = rect
+    return (l + d, t + d, r - d, b - d)
+
+def pocket_targets(rect, ball_radius=0.0) -> np.ndarray:
+    # Where a ball centre has to arrive to drop: pocket centres pulled onto the inset rails
+    l, t, r, b = inset_rect(rect, ball_radius)
+    return np.clip(pocket_centers(rect), (l, t), (r, b))
+
+def _mirror(v, lo, hi, m):
+    # Image of coordinate v after unfolding m cells of the [lo, hi] strip
+    w = hi - lo
+    return np.where(m % 2 == 0, v + m * w, lo + hi - v + m * w)
+
+def solve_banks(start, rect, max_cushions=2, ball_radius=0.0, mouth=None):
+    """Every aim direction from `start` that pockets a ball off 0..max_cushions cushions.
+
+    Unfolds the six pocket targets over the mirrored table lattice (|mx| + |my| cushions),
+    then keeps an image only if the forward trace really hits exactly that many cushions
+    before arriving, and none of those contacts lands inside a pocket mouth (`mouth`
+    defaults to ball_radius * 2). Results are sorted by cushion count, then distance.
+    """
+    l, t, r, b = rails = inset_rect(rect, ball_radius)
+    s = as_points(start)[0]
+    targets = pocket_targets(rect, ball_radius)
+    mouth = ball_radius * 2.0 if mouth is None else mouth
+
+    n = int(max_cushions)
+    mx, my = np.meshgrid(np.arange(-n, n + 1), np.arange(-n, n + 1), indexing="ij")
+    keep = (np.abs(mx) + np.abs(my)) <= n
+    mx, my = mx[keep], my[keep]
+    # (pockets × images) lattice, flattened
+    pk = np.repeat(np.arange(len(targets)), len(mx))
+    mx = np.tile(mx, len(targets)); my = np.tile(my, len(targets))
+    img = np.stack([_mirror(targets[pk, 0], l, r, mx), _mirror(targets[pk, 1], t, b, my)], axis=1)
+    cushions = np.abs(mx) + np.abs(my)
+
+    vec = img - s; dist = np.hypot(vec[:, 0], vec[:, 1])
+    ok = dist > EPS
+    pk, cushions, vec, dist = pk[ok], cushions[ok], vec[ok], dist[ok]
+    direction = vec / dist[:, None]
+
+    # Forward check: cushion k lies strictly before the target, cushion k+1 does not
+    hits, valid = trace_banks(s, direction, rails, n + 1)
+    legs = np.diff(np.concatenate([np.repeat(s[None, None], len(hits), axis=0), hits], axis=1), axis=1)
+    travelled = np.cumsum(np.hypot(legs[..., 0], legs[..., 1]), axis=1)
+    travelled[~valid] = np.inf
+    rows = np.arange(len(hits))
+    tol = max(EPS, 1e-6 * float(dist.max(initial=1.0)))
+    before = np.where(cushions > 0, travelled[rows, np.maximum(cushions - 1, 0)] < dist - tol, True)
+    after = travelled[rows, cushions] >= dist - tol
+    ok = before & after
+
+    # Contacts inside a pocket mouth would drop the ball early
+    if mouth > 0 and n > 0:
+        near = np.hypot(*(hits[:, :n, None, :] - targets[None, None]).transpose(3, 0, 1, 2)) < mouth
+        used = np.arange(n)[None, :] < cushions[:, None]
+        ok &= ~(near.any(axis=2) & used).any(axis=1)
+
+    # Identical directions to the same pocket (images on a rail coincide) count once
+    idx = np.flatnonzero(ok)
+    idx = idx[np.lexsort((dist[idx], cushions[idx]))]
+    seen, out = set(), []
+    for i in idx:
+        key = (int(pk[i]), round(float(direction[i, 0]), 6), round(float(direction[i, 1]), 6))
+        if key not in seen: seen.add(key); out.append(i)
+    out = np.asarray(out, dtype=int)
+    hits = hits[out, :max(n, 1)] if n else np.zeros((len(out), 0, 2))
+    return BankSolutions(pk[out], cushions[out], direction[out], dist[out], hits)
+
+# ------------- Obstructions -------------
+Obstructions = namedtuple("Obstructions", "blocked blocker t")
+
+def obstructions(seg_a, seg_b, balls, radius, ignore=None):
+    """Swept-circle test of every segment against every ball in one batched call.
+
+    A ball of `radius` travelling a→b is blocked by a ball whose centre lies within 2·radius
+    of the segment (the capsule around the path). `ignore` is an optional (M, K) bool mask of
+    balls a segment may pass through (the moving ball itself, its intended target).
+    Returns blocked (M,), blocker (M,) = index of the first ball touched or -1, and
+    t (M,) = fraction of the segment travelled at first contact (1.0 when clear).
+    """
+    a = as_points(seg_a); b = as_points(seg_b); c = as_points(balls)
+    m, k = len(a), len(c)
+    if m == 0 or k == 0:
+        return Obstructions(np.zeros(m, dtype=bool), np.full(m, -1), np.ones(m))
+    d = b - a                                            # (M, 2)
+    L2 = np.einsum("ij,ij->i", d, d)[:, None]            # (M, 1)
+    ac = c[None, :, :] - a[:, None, :]                   # (M, K, 2)
+    proj = np.einsum("mkj,mj->mk", ac, d)                # (M, K) = t·|d|²
+    t = np.clip(proj / np.where(L2 > 0, L2, 1.0), 0.0, 1.0)
+    closest = a[:, None, :] + t[..., None] * d[:, None, :]
+    gap2 = np.sum((c[None, :, :] - closest) ** 2, axis=2)
+    R2 = (2.0 * radius) ** 2
+    hit = gap2 < R2
+    if ignore is not None: hit &= ~np.asarray(ignore, dtype=bool)
+    # Contact fraction: back off from the closest approach along the path
+    L = np.sqrt(L2)
+    perp2 = np.maximum(np.sum(ac ** 2, axis=2) - proj ** 2 / np.where(L2 > 0, L2, 1.0), 0.0)
+    back = np.sqrt(np.maximum(R2 - perp2, 0.0)) / np.where(L > 0, L, 1.0)
+    t_contact = np.where(hit, np.clip(proj / np.where(L2 > 0, L2, 1.0) - back, 0.0, 1.0), np.inf)
+    first = np.argmin(t_contact, axis=1)
+    tc = t_contact[np.arange(m), first]
+    blocked = np.isfinite(tc)
+    return Obstructions(blocked, np.where(blocked, first, -1), np.where(blocked, tc, 1.0))
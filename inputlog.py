@@ -0,0 +1,48 @@
+# inputlog.py
+# Compact binary log of the overlay's raw input stream (Qt-free):
+# - header: magic, version, widget size and the layout the session started from (JSON)
+# - one fixed-size record per mouse press / move / release and key press
+#
+# Written by `aim.py --record <file>` (or PF_RECORD=<file>); replay.py feeds a log back
+# into a headless Overlay.
+
+import json, struct
+
+MAGIC = b"PFIN"
+VERSION = 2
+HEADER = struct.Struct("<4sHHHI")         # magic, version, width, height, config length
+RECORD = struct.Struct("<dBffIIII")       # t, kind, x, y, button, buttons, key, modifiers
+RECORDS = {1: struct.Struct("<dBffBBII"), # v1 packed the button masks in one byte each (no ExtraButton4+)
+           VERSION: RECORD}
+
+PRESS, MOVE, RELEASE, KEY = 1, 2, 3, 4
+KIND_NAMES = {PRESS: "press", MOVE: "move", RELEASE: "release", KEY: "key"}
+KINDS = {name: kind for kind, name in KIND_NAMES.items()}
+
+class InputRecorder:
+    def __init__(self, path, width, height, config, clock):
+        self.clock = clock; self._t0 = clock()
+        self._f = open(path, "wb")
+        cfg = json.dumps(config, separators=(",", ":")).encode()
+        self._f.write(HEADER.pack(MAGIC, VERSION, width, height, len(cfg))); self._f.write(cfg)
+        self.count = 0
+
+    def record(self, kind, x, y, button=0, buttons=0, key=0, modifiers=0):
+        self._f.write(RECORD.pack(self.clock() - self._t0, kind, x, y, button, buttons, key, modifiers))
+        self.count += 1
+
+    def close(self):
+        if self._f: self._f.close(); self._f = None
+
+def read_log(path):
+    """Returns (header, records): header has width, height and config; records are RECORD tuples."""
+    with open(path, "rb") as f: data = f.read()
+    magic, version, width, height, n = HEADER.unpack_from(data)
+    if magic != MAGIC: raise ValueError(f"not an input log: {path}")
+    rec = RECORDS.get(version)
+    if rec is None: raise ValueError(f"unsupported input log version {version}")
+    off = HEADER.size + n
+    cfg = json.loads(data[HEADER.size:off].decode())
+    body = memoryview(data)[off:]
+    usable = len(body) - len(body) % rec.size        # tolerate a torn last record
+    return {"width": width, "height": height, "config": cfg}, list(rec.iter_unpack(body[:usable]))
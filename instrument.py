@@ -0,0 +1,92 @@
+# instrument.py
+# Per-frame instrumentation for the overlay (Qt-free):
+# - paint duration, input-to-paint latency, input events per frame
+# - time spent in named sections (bank computation, snap hysteresis, ...)
+# - bounded ring buffer for the live sparkline, optional CSV stream
+#
+# Enabled with PF_INSTRUMENT=1 or the panel switch; PF_INSTRUMENT_CSV=<path> streams samples.
+# PhaseTimer records the one-off startup phases reported by `aim.py --profile-startup`.
+
+import csv, time
+from collections import deque
+
+SECTIONS = ("bank", "snap", "obstruction", "physics")
+FIELDS = ("t", "paint_ms", "latency_ms", "events") + tuple(f"{s}_ms" for s in SECTIONS)
+
+def percentile(values, q):
+    if not values: return 0.0
+    v = sorted(values); i = min(len(v) - 1, max(0, int(round(q * (len(v) - 1)))))
+    return v[i]
+
+class FrameStats:
+    def __init__(self, size=240, csv_path=None):
+        self.samples = deque(maxlen=size)
+        self._events = 0
+        self._first_input = None       # perf_counter() of the oldest input not yet painted
+        self._t0 = None
+        self._sections = dict.fromkeys(SECTIONS, 0.0)
+        self._csv_file = self._csv = None
+        if csv_path:
+            self._csv_file = open(csv_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file); self._csv.writerow(FIELDS)
+
+    # ----- input side -----
+    def input_event(self):
+        self._events += 1
+        if self._first_input is None: self._first_input = time.perf_counter()
+
+    # ----- paint side -----
+    def begin_frame(self):
+        # Section times added since the last frame (e.g. from input handling) count toward this one
+        self._t0 = time.perf_counter()
+
+    def add(self, name, seconds):
+        self._sections[name] = self._sections.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        if self._t0 is None: return
+        now = time.perf_counter()
+        s = {"t": now, "paint_ms": (now - self._t0) * 1e3,
+             "latency_ms": (now - self._first_input) * 1e3 if self._first_input is not None else 0.0,
+             "events": self._events}
+        for k, v in self._sections.items(): s[f"{k}_ms"] = v * 1e3
+        self.samples.append(s)
+        if self._csv:
+            self._csv.writerow([round(s[f], 4) if isinstance(s[f], float) else s[f] for f in FIELDS])
+        self._events = 0; self._first_input = None; self._t0 = None
+        for k in self._sections: self._sections[k] = 0.0
+
+    # ----- reporting -----
+    def series(self, field):
+        return [s[field] for s in self.samples]
+
+    def summary(self):
+        paint, lat = self.series("paint_ms"), [v for v in self.series("latency_ms") if v > 0]
+        ev = self.series("events")
+        return {"frames": len(self.samples),
+                "paint_p50": percentile(paint, 0.5), "paint_p95": percentile(paint, 0.95),
+                "latency_p50": percentile(lat, 0.5), "latency_p95": percentile(lat, 0.95),
+                "events_per_frame": (sum(ev) / len(ev)) if ev else 0.0}
+
+    def close(self):
+        if self._csv_file: self._csv_file.close(); self._csv_file = self._csv = None
+
+class PhaseTimer:
+    def __init__(self):
+        self.t0 = self._last = time.perf_counter()
+        self.phases = []               # (name, seconds), in the order they happened
+
+    def mark(self, name):
+        # Close the phase that started at the previous mark
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last)); self._last = now
+
+    def add(self, name, seconds):
+        # A phase timed elsewhere (e.g. deferred work); not part of the mark chain
+        self.phases.append((name, seconds))
+
+    def report(self):
+        w = max([len(n) for n, _ in self.phases] + [5])
+        lines = [f"{n:{w}s} {s * 1e3:8.1f} ms" for n, s in self.phases]
+        lines.append(f"{'total':{w}s} {(self._last - self.t0) * 1e3:8.1f} ms  (to last mark)")
+        return "\n".join(lines)
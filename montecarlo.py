@@ -0,0 +1,71 @@
+# montecarlo.py
+# Qt-free pocket-probability estimate for the drawn bank shot:
+# - perturb the aim angle around the p1 → p2 line (normal spread), trace every sample through
+#   the cushions, and count which pocket each path reaches first
+# - with a cushions.CushionModel (the one the drawn bank line is traced through) a sample drops
+#   where that line would drop and rattles out where it would; without one, the straight rails
+#   of the rect are traced and a leg passing within `capture` of a pocket counts as a drop
+# - estimate() works through the samples in chunks and gives up between chunks once its
+#   cancelled() callback says the shot has changed (it runs on the compute service's pool)
+#
+# Results are probabilities for the six pockets (hotkey order) plus a final "no pocket" slot.
+
+import math
+
+import numpy as np
+import geometry as geo
+
+SAMPLES = 4096           # aim samples per estimate
+CHUNK = 1024             # samples per NumPy pass (cancellation point)
+SPREAD_DEG = 0.75        # standard deviation of the aim error
+
+def pocket_hits(start, directions, rect, max_banks, capture, model=None):
+    """Index of the pocket each ray reaches first (0–5), or 6 if none within max_banks cushions.
+
+    A path reaches a pocket when it crosses the pocket's drop line in `model`, or (no model)
+    when one of its legs passes within `capture` of the pocket centre.
+    """
+    return first_pockets(start, directions, rect, max_banks, capture, model)[0]
+
+def first_pockets(starts, directions, rect, max_banks, capture, model=None):
+    # (pocket, leg) per ray: pocket 0–5 or 6 for none, leg = cushions hit before it (-1 for none).
+    # `starts` is one point or one per ray.
+    if model is not None: return model.first_drops(starts, directions, max_banks)
+    dirs = geo.as_points(directions); n = len(dirs)
+    hits, valid = geo.trace_banks(starts, dirs, rect, max_banks)                # (n, B, 2)
+    a = np.concatenate([np.broadcast_to(geo.as_points(starts)[:, None], (n, 1, 2)), hits[:, :-1]], axis=1)
+    d = hits - a
+    pk = geo.pocket_centers(rect)                                               # (6, 2)
+    ap = pk[None, None] - a[:, :, None]                                         # (n, B, 6, 2)
+    dd = (d * d).sum(-1)[..., None]
+    t = np.clip((ap * d[:, :, None]).sum(-1) / np.where(dd > 0, dd, 1.0), 0.0, 1.0)
+    gap = ap - t[..., None] * d[:, :, None]
+    dist2 = (gap * gap).sum(-1)                                                 # (n, B, 6)
+    dist2[~valid] = np.inf
+    near = dist2 <= capture * capture
+    leg_hit = near.any(axis=2)                                                  # (n, B)
+    first = np.where(leg_hit.any(axis=1), leg_hit.argmax(axis=1), -1)
+    out = np.full(n, 6)
+    ok = first >= 0
+    out[ok] = dist2[ok, first[ok]].argmin(axis=1)
+    return out, first
+
+def sample_directions(direction, n, spread_deg, rng):
+    base = math.atan2(direction[1], direction[0])
+    ang = base + np.radians(spread_deg) * rng.standard_normal(n)
+    return np.stack([np.cos(ang), np.sin(ang)], axis=1)
+
+def estimate(start, direction, rect, max_banks, capture, samples=SAMPLES, spread_deg=SPREAD_DEG, index=None, model=None, cancelled=None):
+    """Probabilities for the six pockets plus "no pocket"; None if cancelled between chunks.
+
+    With a pocketindex.PocketIndex built for this table (and `model`), samples are looked up
+    instead of traced.
+    """
+    counts = np.zeros(7)
+    for i in range(math.ceil(samples / CHUNK)):
+        if cancelled is not None and cancelled(): return None
+        rng = np.random.default_rng(i)                                          # fixed seeds: same shot, same answer
+        dirs = sample_directions(direction, min(CHUNK, samples - i * CHUNK), spread_deg, rng)
+        hits = index.lookup(start, dirs, rect, max_banks, model) if index is not None else pocket_hits(start, dirs, rect, max_banks, capture, model)
+        counts += np.bincount(hits, minlength=7)
+    return counts / counts.sum()
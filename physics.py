@@ -0,0 +1,172 @@
+# physics.py
+# Qt-free shot preview: the cue ball is struck to send the object ball toward a target point
+# (ghost-ball aim), then every ball is integrated with sliding/rolling cloth friction,
+# ball-ball collisions and cushion restitution until all of them stop or drop.
+#
+# Between events each ball has constant acceleration (sliding: against the slip, rolling:
+# against the velocity), so a chunk of fixed substeps is evaluated at once with NumPy. The
+# first cushion, ball, pocket or slide→roll/stop event inside the chunk is resolved at its
+# substep and the next chunk starts from there. A ball-ball contact is first rewound to the
+# exact time of impact inside that substep, so the contact normal (and the object ball's line)
+# does not depend on the step size; the step itself is capped so no ball moves more than
+# MAX_STEP_R radii per substep. Simulation.advance() runs against a time
+# budget and can be resumed; run_shot() drives it in budget-sized slices on a worker thread.
+#
+# Units are pixels and seconds; the playfield width is taken as TABLE_LENGTH_M metres.
+
+import math, time
+import numpy as np
+
+G = 9.81                 # m/s²
+TABLE_LENGTH_M = 2.54    # 9 ft table playfield
+MU_SLIDE = 0.2           # ball–cloth sliding friction
+MU_ROLL = 0.012          # rolling resistance
+CUSHION_E = 0.75         # normal restitution off a cushion
+BALL_E = 0.95            # normal restitution ball–ball
+DT = 0.002               # default substep (s)
+MAX_STEP_R = 0.5         # longest substep travel, in ball radii (well under the 2R contact distance)
+CHUNK = 256              # substeps evaluated per NumPy pass
+PATH_STRIDE = 6          # keep every n-th substep position for drawing
+EPS_V = 1e-3             # px/s below which a velocity / slip counts as zero
+
+def aim_direction(cue, obj, target, radius):
+    # Ghost-ball aim: at contact the cue ball sits 2R behind obj on the obj → target line.
+    # Falls back to a straight hit on obj when the cut would be 90° or more.
+    cue, obj, target = (np.asarray(p, dtype=float) for p in (cue, obj, target))
+    straight = obj - cue; ns = math.hypot(*straight)
+    d = target - obj; nd = math.hypot(*d)
+    if nd > 1e-9:
+        a = obj - d / nd * 2 * radius - cue; na = math.hypot(*a)
+        if na > 1e-9 and a @ d > 0: return a / na
+    return straight / ns if ns > 1e-9 else np.array([1.0, 0.0])
+
+class Simulation:
+    def __init__(self, balls, direction, speed, rect, radius, pockets, dt=DT, max_time=30.0):
+        """balls: (N, 2) centres, ball 0 is the cue ball; speed in m/s; rect (l, t, r, b) is the cloth."""
+        l, t, r, b = rect
+        self.scale = (r - l) / TABLE_LENGTH_M               # px per metre
+        self.g = G * self.scale
+        self.radius = float(radius); self.dt = float(dt); self.max_time = max_time
+        self.bounds = (l + radius, t + radius, r - radius, b - radius)
+        self.pockets = np.asarray(pockets, dtype=float).reshape(-1, 2)
+        self.capture = 2.0 * radius
+        self.pos = np.array(balls, dtype=float).reshape(-1, 2)
+        n = len(self.pos)
+        self.vel = np.zeros((n, 2)); self.roll = np.zeros((n, 2))   # roll = ω × R, the pure-rolling velocity
+        self.vel[0] = np.asarray(direction, dtype=float) * speed * self.scale
+        self.alive = np.ones(n, dtype=bool)
+        self.paths = [[tuple(p)] for p in self.pos.tolist()]
+        self.pocketed = {}               # ball -> pocket index
+        self.first_contact = None        # (cue position, object ball) at the first ball-ball hit
+        self.t = 0.0; self.steps = 0; self.done = False
+        self.elapsed = 0.0               # wall time spent in advance()
+
+    # ------------- Phases -------------
+    def _phases(self):
+        # Per-ball velocity and spin acceleration plus time until the current phase ends
+        n = len(self.pos)
+        av = np.zeros((n, 2)); ar = np.zeros((n, 2)); tau = np.full(n, np.inf)
+        slip = self.vel - self.roll
+        s = np.hypot(slip[:, 0], slip[:, 1]); v = np.hypot(self.vel[:, 0], self.vel[:, 1])
+        sliding = self.alive & (s > EPS_V); rolling = self.alive & ~sliding & (v > EPS_V)
+        if sliding.any():
+            u = slip[sliding] / s[sliding, None]; f = MU_SLIDE * self.g
+            av[sliding] = -f * u; ar[sliding] = 2.5 * f * u
+            tau[sliding] = s[sliding] / (3.5 * f)
+        if rolling.any():
+            u = self.vel[rolling] / v[rolling, None]; f = MU_ROLL * self.g
+            av[rolling] = ar[rolling] = -f * u
+            tau[rolling] = v[rolling] / f
+        return av, ar, tau, sliding, rolling
+
+    # ------------- Stepping -------------
+    def advance(self, budget_s):
+        """Integrate until the shot ends or budget_s seconds of wall time are used. Returns done."""
+        t0 = time.perf_counter(); t_end = t0 + budget_s
+        while not self.done:
+            self._chunk()
+            if time.perf_counter() >= t_end: break
+        self.elapsed += time.perf_counter() - t0
+        return self.done
+
+    def _chunk(self):
+        av, ar, tau, sliding, rolling = self._phases()
+        moving = sliding | rolling
+        if not moving.any() or self.t >= self.max_time: self.done = True; return
+        idx = np.flatnonzero(moving)
+        vmax = np.hypot(self.vel[idx, 0], self.vel[idx, 1]).max()
+        dt = min(self.dt, MAX_STEP_R * self.radius / vmax) if vmax > 0 else self.dt
+        m = int(min(CHUNK, max(1, math.ceil(tau[idx].min() / dt))))
+        ts = dt * np.arange(1, m + 1)
+        te = np.minimum(ts[:, None], tau[None, idx])[..., None]                 # (m, k, 1), frozen past phase end
+        P = self.pos[idx] + self.vel[idx] * te + 0.5 * av[idx] * te * te        # (m, k, 2)
+        V = self.vel[idx] + av[idx] * te
+        l, t, r, b = self.bounds
+
+        # First substep of each event kind (m when none)
+        wall = ((P[..., 0] < l) & (V[..., 0] < 0)) | ((P[..., 0] > r) & (V[..., 0] > 0)) | \
+               ((P[..., 1] < t) & (V[..., 1] < 0)) | ((P[..., 1] > b) & (V[..., 1] > 0))
+        d = P[:, :, None, :] - self.pockets[None, None]
+        pocket = (d[..., 0] ** 2 + d[..., 1] ** 2 < self.capture ** 2).any(axis=2)
+        allp = np.broadcast_to(self.pos, (m,) + self.pos.shape).copy(); allp[:, idx] = P
+        dd = allp[:, None, :, :] - P[:, :, None, :]                             # (m, k, N, 2)
+        dist = np.hypot(dd[..., 0], dd[..., 1])
+        prev = np.concatenate([np.hypot(*(self.pos[None] - self.pos[idx, None]).transpose(2, 0, 1))[None], dist[:-1]])
+        contact = (dist < 2 * self.radius) & (dist < prev) & self.alive[None, None]
+        contact[:, np.arange(len(idx)), idx] = False
+        phase = (tau[idx][None] <= ts[:, None] + 1e-12)
+        hits = wall | pocket | contact.any(axis=2) | phase
+        rows = np.flatnonzero(hits.any(axis=1))
+        k = int(rows[0]) if len(rows) else m - 1
+
+        # Advance to substep k
+        tk = te[k]
+        for j, i in enumerate(idx.tolist()):
+            self.paths[i].extend(map(tuple, P[PATH_STRIDE - 1:k:PATH_STRIDE, j].tolist())); self.paths[i].append(tuple(P[k, j].tolist()))
+        self.pos[idx] = P[k]; self.vel[idx] = V[k]; self.roll[idx] += ar[idx] * tk
+        self.t += ts[k]; self.steps += k + 1
+
+        # Resolve what happened there
+        for j, i in enumerate(idx.tolist()):
+            if phase[k, j]:
+                if sliding[i]: self.roll[i] = self.vel[i]                       # slide → roll
+                else: self.vel[i] = self.roll[i] = 0.0                          # stopped
+            if pocket[k, j]:
+                self.pocketed[i] = int(np.argmin(np.hypot(*(self.pockets - self.pos[i]).T)))
+                self.alive[i] = False; self.vel[i] = self.roll[i] = 0.0; continue
+            if wall[k, j]:
+                x, y = self.pos[i]
+                if x < l or x > r: self.vel[i, 0] *= -CUSHION_E; self.roll[i, 0] = 0.0; self.pos[i, 0] = min(max(x, l), r)
+                if y < t or y > b: self.vel[i, 1] *= -CUSHION_E; self.roll[i, 1] = 0.0; self.pos[i, 1] = min(max(y, t), b)
+            for o in np.flatnonzero(contact[k, j]).tolist():
+                s = self._impact_rewind(i, o, dt)
+                self.pos[i] -= self.vel[i] * s; self.pos[o] -= self.vel[o] * s      # back to first touch
+                n = self.pos[o] - self.pos[i]; n /= max(np.hypot(*n), 1e-9)
+                rel = (self.vel[i] - self.vel[o]) @ n
+                if rel > 0:
+                    dv = 0.5 * (1 + BALL_E) * rel * n
+                    self.vel[i] -= dv; self.vel[o] += dv
+                    if self.first_contact is None: self.first_contact = (tuple(self.pos[i].tolist()), o)
+                for q in (i, o): self.paths[q][-1] = tuple(self.pos[q].tolist())
+                self.pos[i] += self.vel[i] * s; self.pos[o] += self.vel[o] * s      # rest of the substep
+                for q in (i, o): self.paths[q].append(tuple(self.pos[q].tolist()))
+
+    def _impact_rewind(self, i, o, dt):
+        # Time s in [0, dt] since balls i and o touched: |d - w·s| = 2R with d = o - i and w the
+        # relative velocity (constant within a substep), the larger root of the quadratic
+        d = self.pos[o] - self.pos[i]; w = self.vel[o] - self.vel[i]
+        a = w @ w; bd = d @ w; c = d @ d - 4 * self.radius * self.radius
+        if a < 1e-12 or c >= 0: return 0.0
+        return min(max((bd + math.sqrt(bd * bd - a * c)) / a, 0.0), dt)
+
+def shot(cue, obj, target, others, rect, radius, pockets, speed, dt=DT):
+    # Simulation for p1 (cue) struck at p2 (obj) aiming it at target; `others` take part in collisions
+    balls = [cue, obj] + list(others)
+    return Simulation(balls, aim_direction(cue, obj, target, radius), speed, rect, radius, pockets, dt)
+
+def run_shot(balls, target, rect, radius, pockets, speed, dt=DT, slice_s=0.004, cancelled=None):
+    # Whole shot for balls[0] (cue) → balls[1] (object); None if cancelled between slices
+    sim = shot(balls[0], balls[1], target, balls[2:], rect, radius, pockets, speed, dt)
+    while not sim.advance(slice_s):
+        if cancelled is not None and cancelled(): return None
+    return sim
@@ -0,0 +1,118 @@
+# pocketindex.py
+# Qt-free lookup table from (start cell, aim angle) to the pocket a bank path reaches first.
+#
+# For a given playfield size the outcome of a shot only depends on where it starts and the
+# direction it leaves in, so the table is precomputed once per size over CELL-px start cells
+# and ANGLES aim directions, traced through the same cushions.CushionModel (rails, jaws, drop
+# lines) the bank line is drawn with. Each entry is one byte: (cushions before the pocket << 3)
+# | pocket, or NONE. Tables are relative to the table's top-left corner, so moving the table
+# reuses them; they are cached on disk as .npy files keyed on the (rounded) table size, pocket
+# radius and corner radius, at most MAX_TABLES of them.
+#
+# A lookup reads the four cell centres around the start and the two angle bins around each
+# direction. Where all eight entries agree the answer is taken from the table; where they
+# disagree the ray is near an outcome boundary (a jaw, a pocket edge) and is traced exactly, so
+# quantization never flips a sample to the wrong pocket away from those boundaries.
+
+import os, math, tempfile
+
+import numpy as np
+from cushions import CushionModel
+
+CELL = 24                # start cell size (px)
+ANGLES = 2048            # aim directions over the full circle (~0.18° per bin)
+MAX_BANKS = 4            # deepest query the table answers
+NONE = 0xFF
+VERSION = 2              # bump when the encoding or the tracer changes
+ROWS_PER_PASS = 2        # start-cell rows traced per NumPy pass (cancellation point)
+MAX_TABLES = 4           # cached table files kept on disk (~2.3 MB each), least recently used go first
+
+class PocketIndex:
+    def __init__(self, size, pocket_radius, corner_radius, table):
+        self.size = size                 # (width, height) the table was built for
+        self.pocket_radius = pocket_radius
+        self.corner_radius = corner_radius
+        self.table = table               # (rows, cols, ANGLES) uint8
+
+    def matches(self, rect, pocket_radius, corner_radius):
+        return self.size == table_size(rect) and (self.pocket_radius, self.corner_radius) == _radii(pocket_radius, corner_radius)
+
+    def lookup(self, start, directions, rect, max_banks, model):
+        """Same contract as montecarlo.pocket_hits: pocket 0–5 per direction, or 6 for none.
+        `model` is the CushionModel of `rect` the table was built for; unsure rays are traced in it."""
+        rows, cols, _ = self.table.shape
+        fx = (start[0] - rect[0]) / CELL - 0.5; fy = (start[1] - rect[1]) / CELL - 0.5
+        cx = sorted({min(max(c, 0), cols - 1) for c in (math.floor(fx), math.floor(fx) + 1)})
+        cy = sorted({min(max(c, 0), rows - 1) for c in (math.floor(fy), math.floor(fy) + 1)})
+        d = np.asarray(directions, dtype=float).reshape(-1, 2)
+        a0 = np.floor(np.arctan2(d[:, 1], d[:, 0]) * (ANGLES / (2 * math.pi))).astype(np.int64) % ANGLES
+        a = np.stack([a0, (a0 + 1) % ANGLES])                                 # (2, n) bracketing bins
+        code = self.table[np.ix_(cy, cx)].reshape(-1, ANGLES)[:, a]           # (cells, 2, n)
+        pocket = np.where((code != NONE) & ((code >> 3) < max_banks), code & 7, 6).reshape(-1, len(d))
+        out = pocket[0].copy()
+        unsure = (pocket != out).any(axis=0)
+        if unsure.any(): out[unsure] = model.first_drops(start, d[unsure], max_banks)[0]
+        return out
+
+def table_size(rect):
+    return (int(round(rect[2] - rect[0])), int(round(rect[3] - rect[1])))
+
+def _radii(pocket_radius, corner_radius):
+    return round(pocket_radius, 1), round(corner_radius, 1)
+
+def build(size, pocket_radius, corner_radius, cancelled=None):
+    # Trace every (cell centre, angle) pair; None if cancelled between passes
+    w, h = size; rows, cols = max(1, math.ceil(h / CELL)), max(1, math.ceil(w / CELL))
+    model = CushionModel((0.0, 0.0, float(w), float(h)), pocket_radius, corner_radius)
+    ang = np.arange(ANGLES) * (2 * math.pi / ANGLES)
+    dirs = np.stack([np.cos(ang), np.sin(ang)], axis=1)
+    xs = np.minimum((np.arange(cols) + 0.5) * CELL, w - 0.5)
+    table = np.empty((rows, cols, ANGLES), dtype=np.uint8)
+    for y0 in range(0, rows, ROWS_PER_PASS):
+        if cancelled is not None and cancelled(): return None
+        ys = np.minimum((np.arange(y0, min(rows, y0 + ROWS_PER_PASS)) + 0.5) * CELL, h - 0.5)
+        gx, gy = np.meshgrid(xs, ys)
+        starts = np.repeat(np.stack([gx.ravel(), gy.ravel()], axis=1), ANGLES, axis=0)    # cell-major, angle-minor
+        pocket, leg = model.first_drops(starts, np.tile(dirs, (len(ys) * cols, 1)), MAX_BANKS)
+        code = np.where(leg >= 0, (leg << 3) | pocket, NONE)
+        table[y0:y0 + len(ys)] = code.reshape(len(ys), cols, ANGLES)
+    return PocketIndex(size, pocket_radius, corner_radius, table)
+
+# ------------- Disk cache -------------
+def cache_path(cache_dir, size, pocket_radius, corner_radius):
+    return os.path.join(cache_dir, f"pockets_{size[0]}x{size[1]}_p{pocket_radius:g}_r{corner_radius:g}_g{CELL}_a{ANGLES}_v{VERSION}.npy")
+
+def load_or_build(cache_dir, rect, pocket_radius, corner_radius, cancelled=None):
+    """Index for `rect` from the disk cache, or built (and cached) if there is none."""
+    size, (pr, rc) = table_size(rect), _radii(pocket_radius, corner_radius)
+    path = cache_path(cache_dir, size, pr, rc)
+    try:
+        index = PocketIndex(size, pr, rc, np.load(path))
+        os.utime(path)                                   # mark as recently used for eviction
+        return index
+    except (OSError, ValueError):
+        pass
+    index = build(size, pr, rc, cancelled)
+    if index is not None:
+        try: _write(path, index.table); _evict(cache_dir)
+        except OSError as ex: print("Pocket index cache write failed:", ex)
+    return index
+
+def _evict(cache_dir, keep=MAX_TABLES):
+    # Drop the least recently used tables beyond `keep`
+    paths = [os.path.join(cache_dir, n) for n in os.listdir(cache_dir) if n.startswith("pockets_") and n.endswith(".npy")]
+    for path in sorted(paths, key=os.path.getmtime, reverse=True)[keep:]:
+        try: os.remove(path)
+        except OSError: pass
+
+def _write(path, table):
+    # Atomic like the profile store: temp file in the same directory, then os.replace
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".pockets.", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f: np.save(f, table)
+        os.replace(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
@@ -0,0 +1,83 @@
+# predictor.py
+# Qt-free cursor predictor for carry mode:
+# - a small ring buffer of timestamped cursor samples (event timestamps, ms)
+# - velocity from a least-squares fit over the last WINDOW_MS of samples
+# - extrapolation to the expected display time, with the lead and the offset both capped; the
+#   lead is the measured interval between applied frames (the caller's frame budget until known)
+# - history reset when the cursor stops (gap > STOP_MS) or the carried ball snaps
+#
+# It also scores itself: each position it hands out is meant for display time (newest sample +
+# lead); once a later sample arrives, the cursor at that time is interpolated between the two
+# samples around it and compared with the predicted position and with the raw newest sample
+# (what would have been shown without prediction). The lag it hides shows up as a drop from
+# raw_px to pred_px.
+
+import math
+from collections import deque
+from instrument import percentile
+
+SAMPLES = 8              # ring buffer size
+WINDOW_MS = 48.0         # samples older than this (relative to the newest) are ignored for velocity
+STOP_MS = 40.0           # a gap longer than this means the cursor stopped: start over
+MAX_LEAD_MS = 33.0       # never extrapolate further ahead than two 60 Hz frames
+MAX_OFFSET_PX = 24.0     # bounded error: the prediction stays within this of the last sample
+
+class CursorPredictor:
+    def __init__(self, size=SAMPLES, max_offset=MAX_OFFSET_PX):
+        self.samples = deque(maxlen=size)      # (t_ms, x, y)
+        self.max_offset = max_offset
+        self.lead_ms = None                    # smoothed interval between applied frames (event time)
+        self._applied = None                   # newest sample time at the last predict()
+        self._shown = deque(maxlen=64)         # (display t_ms, predicted xy, raw xy) not scored yet
+        self.errors = deque(maxlen=4096)       # (raw_px, pred_px) per scored display
+
+    def reset(self):
+        self.samples.clear(); self._shown.clear(); self._applied = None
+
+    def add(self, t, x, y):
+        if self.samples and t - self.samples[-1][0] > STOP_MS: self.reset()
+        if self.samples: self._score(t, x, y)
+        self.samples.append((t, x, y))
+
+    def _score(self, t, x, y):
+        # Displays due by t, against the cursor interpolated between the newest sample and (t, x, y)
+        t0, x0, y0 = self.samples[-1]
+        while self._shown and self._shown[0][0] <= t:
+            td, (px, py), (rx, ry) = self._shown.popleft()
+            u = min(max((td - t0) / (t - t0), 0.0), 1.0) if t > t0 else 1.0
+            ax, ay = x0 + (x - x0) * u, y0 + (y - y0) * u
+            self.errors.append((math.hypot(rx - ax, ry - ay), math.hypot(px - ax, py - ay)))
+
+    def velocity(self):
+        # px/ms from a least-squares line through the recent samples (0, 0 with fewer than two)
+        t_new = self.samples[-1][0]
+        pts = [s for s in self.samples if t_new - s[0] <= WINDOW_MS]
+        if len(pts) < 2: return 0.0, 0.0
+        n = len(pts); mt = sum(s[0] for s in pts) / n
+        mx = sum(s[1] for s in pts) / n; my = sum(s[2] for s in pts) / n
+        var = sum((s[0] - mt) ** 2 for s in pts)
+        if var <= 0: return 0.0, 0.0
+        return (sum((s[0] - mt) * (s[1] - mx) for s in pts) / var,
+                sum((s[0] - mt) * (s[2] - my) for s in pts) / var)
+
+    def predict(self, frame_ms):
+        """Expected cursor position one applied frame after the newest sample; frame_ms is the
+        frame budget used until the interval between applied frames has been measured."""
+        if not self.samples: return None
+        t, x, y = self.samples[-1]
+        if self._applied is not None and t > self._applied:
+            dt = t - self._applied
+            self.lead_ms = dt if self.lead_ms is None else 0.8 * self.lead_ms + 0.2 * dt
+        self._applied = t
+        vx, vy = self.velocity()
+        lead = min(max(frame_ms if self.lead_ms is None else self.lead_ms, 0.0), MAX_LEAD_MS)
+        dx, dy = vx * lead, vy * lead
+        d = math.hypot(dx, dy)
+        if d > self.max_offset: dx, dy = dx * self.max_offset / d, dy * self.max_offset / d
+        self._shown.append((t + lead, (x + dx, y + dy), (x, y)))
+        return x + dx, y + dy
+
+    def summary(self):
+        raw = [e[0] for e in self.errors]; pred = [e[1] for e in self.errors]
+        return {"samples": len(raw), "raw_p50_px": percentile(raw, 0.5), "raw_p95_px": percentile(raw, 0.95),
+                "pred_p50_px": percentile(pred, 0.5), "pred_p95_px": percentile(pred, 0.95)}
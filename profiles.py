@@ -0,0 +1,107 @@
+# profiles.py
+# Named table profiles in one JSON file (Qt-free):
+# - whole file read once into an in-memory index; switching profiles never touches the disk
+# - writes are atomic (temp file in the same directory + fsync + os.replace)
+# - writes happen on a background thread; only the newest snapshot is written
+#
+# File layout: {"version": 2, "active": "<name>", "profiles": {"<name>": {...overlay config...}}}
+# A legacy single-layout pf_config.json is read as the "default" profile. A file that fails to
+# load is moved aside to <file>.bak before anything new is written over it; if that is not
+# possible the store stays read-only until an explicit save.
+
+import os, json, copy, tempfile, threading
+
+DEFAULT_PROFILE = "default"
+
+class ProfileStore:
+    def __init__(self, path):
+        self.path = path
+        self.profiles = {}
+        self.active = DEFAULT_PROFILE
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()     # set when a newer snapshot is waiting to be written
+        self._closed = False
+        self._pending = None                # (active, profiles) snapshot for the writer
+        self.read_only = False              # set when an unreadable file could not be moved aside
+        self._writer = threading.Thread(target=self._write_loop, name="profile-writer", daemon=True)
+        self._writer.start()
+
+    # ------------- Reading -------------
+    def load(self):
+        # Returns False if there is no file yet; raises OSError/ValueError on unreadable/corrupt files
+        if not os.path.exists(self.path): return False
+        with open(self.path, "r") as f: data = json.load(f)
+        if not isinstance(data, dict): raise ValueError(f"{self.path}: expected an object, got {type(data).__name__}")
+        if "profiles" in data:
+            profiles = data["profiles"]
+            if not isinstance(profiles, dict) or not all(isinstance(v, dict) for v in profiles.values()):
+                raise ValueError(f"{self.path}: 'profiles' must map names to layout objects")
+            self.profiles = {str(k): v for k, v in profiles.items()}
+            self.active = str(data.get("active", DEFAULT_PROFILE))
+        else:
+            self.profiles = {DEFAULT_PROFILE: data}; self.active = DEFAULT_PROFILE
+        if self.active not in self.profiles and self.profiles: self.active = next(iter(self.profiles))
+        return True
+
+    def quarantine(self):
+        # After a failed load(): keep the bad file as <file>.bak so autosave cannot destroy it
+        if not os.path.exists(self.path): return None
+        try:
+            os.replace(self.path, self.path + ".bak"); return self.path + ".bak"
+        except OSError:
+            self.read_only = True; return None
+
+    def names(self):
+        return list(self.profiles)
+
+    def get(self, name=None):
+        return self.profiles.get(self.active if name is None else name)
+
+    # ------------- Editing -------------
+    def put(self, name, cfg):
+        with self._lock: self.profiles[name] = copy.deepcopy(cfg)
+
+    def remove(self, name):
+        with self._lock:
+            self.profiles.pop(name, None)
+            if self.active == name: self.active = next(iter(self.profiles), DEFAULT_PROFILE)
+
+    def select(self, name):
+        self.active = name
+
+    # ------------- Writing -------------
+    def save_async(self):
+        # Queue the current state; the writer thread drops anything superseded before it ran
+        if self.read_only: return
+        with self._lock:
+            self._pending = (self.active, copy.deepcopy(self.profiles))
+        self._dirty.set()
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            with self._lock:
+                snap, self._pending = self._pending, None
+                self._dirty.clear()
+            if snap is not None:
+                try: self._write(*snap)
+                except OSError as ex: print("Save failed:", ex)
+            if self._closed and self._pending is None: return
+
+    def _write(self, active, profiles):
+        d = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".pf_config.", suffix=".tmp", dir=d)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": 2, "active": active, "profiles": profiles}, f, indent=2)
+                f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+
+    def close(self, timeout=2.0):
+        # Flush whatever is queued and stop the writer
+        self._closed = True; self._dirty.set()
+        self._writer.join(timeout)
@@ -0,0 +1,140 @@
+# rack.py
+# Qt-free ball storage for the overlay:
+# - UniformGrid: bucket index so point queries only touch the few cells around the query
+# - Rack: any number of balls in a growable (N, 2) position array plus an active mask
+#
+# Slot 0 is the cue ball (p1) and slot 1 the object ball (p2); further slots hold the rest of
+# the rack, up to MAX_BALLS slots in all. Hit-testing and overlap checks go through the grid, so their cost per event does
+# not grow with the number of balls on the table.
+
+import math
+import numpy as np
+
+MAX_BALLS = 64           # slot limit; saved layouts name slots, so a bad index must not size the array
+
+class UniformGrid:
+    def __init__(self, cell):
+        self.cell = float(cell)
+        self.cells = {}                # (cx, cy) -> set of items
+        self.where = {}                # item -> (cx, cy)
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    def insert(self, item, x, y):
+        k = self._key(x, y); old = self.where.get(item)
+        if old == k: return
+        if old is not None: self._drop(item, old)
+        self.cells.setdefault(k, set()).add(item); self.where[item] = k
+
+    def remove(self, item):
+        old = self.where.pop(item, None)
+        if old is not None: self._drop(item, old)
+
+    def _drop(self, item, k):
+        bucket = self.cells[k]; bucket.discard(item)
+        if not bucket: del self.cells[k]
+
+    def clear(self):
+        self.cells.clear(); self.where.clear()
+
+    def near(self, x, y, r):
+        # Items whose cell overlaps the square [x-r, x+r] × [y-r, y+r]
+        x0, y0 = self._key(x - r, y - r); x1, y1 = self._key(x + r, y + r)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield from self.cells.get((cx, cy), ())
+
+    def nearest(self, x, y, r, points, exclude=None):
+        # Closest item within r; `points[item]` gives its (x, y)
+        best, bestd = None, r
+        for i in self.near(x, y, r):
+            if i == exclude: continue
+            d = math.hypot(points[i][0] - x, points[i][1] - y)
+            if d <= bestd: best, bestd = i, d
+        return best
+
+class Rack:
+    def __init__(self, radius, capacity=16):
+        self.radius = float(radius)
+        self.pos = np.zeros((capacity, 2))
+        self.active = np.zeros(capacity, dtype=bool)
+        self.grid = UniformGrid(2 * self.radius)
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def indices(self):
+        return np.flatnonzero(self.active)
+
+    def _grow(self, n):
+        if n <= len(self.pos): return
+        cap = min(max(n, 2 * len(self.pos)), MAX_BALLS)
+        pos = np.zeros((cap, 2)); pos[:len(self.pos)] = self.pos
+        active = np.zeros(cap, dtype=bool); active[:len(self.active)] = self.active
+        self.pos, self.active = pos, active
+
+    def get(self, i):
+        return (float(self.pos[i, 0]), float(self.pos[i, 1]))
+
+    def place(self, i, x, y):
+        if not 0 <= i < MAX_BALLS: raise IndexError(f"ball slot {i} out of range 0–{MAX_BALLS - 1}")
+        self._grow(i + 1)
+        self.pos[i] = (x, y); self.active[i] = True
+        self.grid.insert(i, x, y)
+
+    def add(self, x, y):
+        # Slot of the new ball, or None when all MAX_BALLS slots are taken
+        free = np.flatnonzero(~self.active)
+        i = int(free[0]) if len(free) else len(self.pos)
+        if i >= MAX_BALLS: return None
+        self.place(i, x, y)
+        return i
+
+    def remove(self, i):
+        if i < len(self.active): self.active[i] = False
+        self.grid.remove(i)
+
+    def clear(self, keep=0):
+        # Drop every ball from slot `keep` onwards
+        for i in self.indices():
+            if i >= keep: self.remove(int(i))
+
+    def rebuild(self):
+        self.grid.clear()
+        for i in self.indices(): self.grid.insert(int(i), *self.pos[i])
+
+    def translate(self, dx, dy):
+        self.pos[self.active] += (dx, dy); self.rebuild()
+
+    def clamp(self, left, top, right, bottom):
+        self.pos[self.active] = np.clip(self.pos[self.active], (left, top), (right, bottom)); self.rebuild()
+
+    def hit(self, x, y, r, exclude=None):
+        return self.grid.nearest(x, y, r, self.pos, exclude)
+
+    def resolve_overlap(self, i, x, y):
+        # Push (x, y) out of any other ball it overlaps, to frozen contact
+        d2 = 2 * self.radius
+        for _ in range(4):               # a couple of passes settles clusters
+            moved = False
+            for j in self.grid.near(x, y, d2):
+                if j == i: continue
+                ox, oy = self.pos[j]; dx, dy = x - ox, y - oy; d = math.hypot(dx, dy)
+                if d >= d2 - 1e-6: continue
+                if d < 1e-9: dx, dy, d = 1.0, 0.0, 1.0
+                x, y = ox + dx / d * d2, oy + dy / d * d2; moved = True
+            if not moved: break
+        return float(x), float(y)
+
+def triangle(apex, radius, rows=5, direction=(1.0, 0.0)):
+    # Ball centres of a frozen triangle rack, apex first, opening along `direction`
+    ux, uy = direction; n = math.hypot(ux, uy); ux, uy = ux / n, uy / n
+    px, py = -uy, ux
+    step = radius * math.sqrt(3.0)
+    out = []
+    for row in range(rows):
+        for k in range(row + 1):
+            off = (k - row / 2.0) * 2 * radius
+            out.append((apex[0] + ux * step * row + px * off, apex[1] + uy * step * row + py * off))
+    return out
@@ -0,0 +1,111 @@
+# replay.py
+# Headless replay of an input log recorded with `aim.py --record <file>` (Qt offscreen platform).
+#
+#   python replay.py session.pfin                   replay as fast as possible, print timings + final state hash
+#   python replay.py session.pfin --expect <hash>   exit 1 if the final state differs
+#   python replay.py session.pfin --csv events.csv  also write the per-event timings
+#   python replay.py session.pfin --predict         carry with cursor prediction, print the position error
+#
+# Each event goes through QApplication.sendEvent and pending paints are flushed right after,
+# so an event's time covers its handler plus the repaint it caused. Moves are applied one by
+# one (frame cap off), which keeps the end state independent of how fast the replay runs.
+# Events keep their recorded timestamps, so the cursor predictor sees the original timing. With
+# the frame cap off every move is an applied frame, so the predictor's lead is the recorded
+# event interval. Its carry error is reported when it ran: the cursor interpolated at each
+# frame's display time vs the raw newest sample (raw) and vs the predicted position (pred).
+
+import os, sys, csv, json, time, hashlib, argparse, tempfile
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+import aim
+import inputlog as il
+from instrument import percentile
+
+MOUSE_EVENTS = {il.PRESS: QtCore.QEvent.MouseButtonPress, il.MOVE: QtCore.QEvent.MouseMove,
+                il.RELEASE: QtCore.QEvent.MouseButtonRelease}
+
+def state_hash(w):
+    # Everything a layout persists plus the interaction in flight; frame cap and prediction are replay settings
+    s = w._config_dict(); s["carrying"] = w.carrying; s["dragging"] = repr(w.dragging_handle)
+    s["visuals"].pop("frame_cap", None); s["visuals"].pop("predict", None)
+    return hashlib.sha1(json.dumps(s, sort_keys=True).encode()).hexdigest()[:16]
+
+def make_event(rec):
+    t, kind, x, y, button, buttons, key, mods = rec
+    m = QtCore.Qt.KeyboardModifiers(mods)
+    if kind == il.KEY: ev = QtGui.QKeyEvent(QtCore.QEvent.KeyPress, key, m)
+    else: ev = QtGui.QMouseEvent(MOUSE_EVENTS[kind], QtCore.QPointF(x, y),
+                                 QtCore.Qt.MouseButton(button), QtCore.Qt.MouseButtons(buttons), m)
+    ev.setTimestamp(int(t * 1000))    # ms, like the window system's event timestamps
+    return ev
+
+def replay(path, checkpoint=0, predict=None):
+    """Returns (samples, checkpoints, final_hash, carry error summary or None); samples are
+    (kind, recorded t, ms) per event. predict=True/False overrides the logged prediction setting."""
+    app = QtWidgets.QApplication.instance()
+    header, records = il.read_log(path)
+    w = aim.Overlay(); w.resize(header["width"], header["height"]); w.move(0, 0); w.show()
+    w._finish_startup(); w._apply_config(header["config"]); w.frame_cap = 0
+    if predict is not None: w.predict_cursor = predict
+    app.processEvents()
+
+    samples, checkpoints = [], []
+    for n, rec in enumerate(records, 1):
+        if rec[1] == il.KEY: QtGui.QCursor.setPos(w.mapToGlobal(QtCore.QPoint(round(rec[2]), round(rec[3]))))
+        ev = make_event(rec)
+        t0 = time.perf_counter()
+        app.sendEvent(w, ev); app.processEvents()
+        samples.append((rec[1], rec[0], (time.perf_counter() - t0) * 1e3))
+        if checkpoint and n % checkpoint == 0: checkpoints.append(state_hash(w))
+    final = state_hash(w)
+    carry = w.predictor.summary() if w.predictor.errors else None
+    w._autosave_timer.stop(); w.close(); w.deleteLater()
+    return samples, checkpoints, final, carry
+
+def summarize(samples):
+    out = {}
+    for kind, name in il.KIND_NAMES.items():
+        ms = [s[2] for s in samples if s[0] == kind]
+        if ms: out[name] = {"events": len(ms), "p50_ms": percentile(ms, 0.5), "p95_ms": percentile(ms, 0.95), "max_ms": max(ms)}
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay a recorded overlay input log headless")
+    ap.add_argument("log")
+    ap.add_argument("--expect", help="final state hash the replay must reproduce")
+    ap.add_argument("--checkpoint", type=int, default=0, help="also hash the state every N events")
+    ap.add_argument("--csv", help="write per-event timings (index, recorded t, kind, ms)")
+    ap.add_argument("--out", help="write the summary as JSON")
+    ap.add_argument("--predict", action="store_true", help="carry with cursor prediction on (whatever the log says)")
+    args = ap.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    # The layout comes from the log header; never read or write the user's pf_config.json
+    aim.CONFIG_FILE = os.path.join(tempfile.mkdtemp(prefix="pf_replay_"), "pf_config.json")
+
+    t0 = time.perf_counter()
+    samples, checkpoints, final, carry = replay(args.log, args.checkpoint, True if args.predict else None)
+    wall = time.perf_counter() - t0
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            cw = csv.writer(f); cw.writerow(("i", "t", "kind", "ms"))
+            for i, (kind, t, ms) in enumerate(samples): cw.writerow((i, round(t, 6), il.KIND_NAMES[kind], round(ms, 4)))
+
+    summary = {"events": len(samples), "wall_s": wall, "by_kind": summarize(samples),
+               "checkpoints": checkpoints, "final_hash": final, "carry_error": carry}
+    for name, s in summary["by_kind"].items():
+        print(f"{name:8s} {s['events']:7d} events  p50 {s['p50_ms']:7.3f} ms  p95 {s['p95_ms']:7.3f} ms  max {s['max_ms']:7.3f} ms")
+    if carry:
+        print(f"carry error over {carry['samples']} moves: raw p50 {carry['raw_p50_px']:.1f} px  p95 {carry['raw_p95_px']:.1f} px"
+              f"  -> predicted p50 {carry['pred_p50_px']:.1f} px  p95 {carry['pred_p95_px']:.1f} px")
+    print(f"{len(samples)} events in {wall:.2f} s; final state {final}")
+    if args.out:
+        with open(args.out, "w") as f: json.dump(summary, f, indent=2)
+    if args.expect and args.expect != final:
+        print(f"State mismatch: expected {args.expect}, got {final}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
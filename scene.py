@@ -0,0 +1,116 @@
+# scene.py
+# Memoized, Qt-free scene model for the overlay.
+#
+# Derived geometry (pocket centres, cushion model, bank segments, snapped endpoint) is cached
+# and keyed on the inputs that can change it: table rect, p1, p2, marker and bank depth. Bank
+# legs are traced through cushions.CushionModel, so a path that crosses a pocket's drop line
+# ends there (and locks to that pocket) while one that meets a jaw rattles out. refresh() is
+# called from input handling; painting only reads the cached fields. The semi-lock
+# (hysteresis) of the final bank endpoint lives here too, so it advances once per input
+# change instead of once per paint.
+
+import math, time
+import geometry as geo
+from rack import UniformGrid
+from cushions import CushionModel
+
+POCKET_CELL = 64.0             # pocket grid cell; larger than every snap/lock radius in use
+
+class SceneModel:
+    __slots__ = ("key", "version", "pockets", "segments", "snap_active", "snap_endpoint", "highlight",
+                 "dropped", "bank_s", "snap_s", "_grid_key", "_grid", "_cushion_key", "_cushions",
+                 "_solver_key", "_solver_cushions")
+
+    def __init__(self):
+        self.key = None                # inputs the cached fields were derived from
+        self.version = 0               # bumped on every recompute
+        self.pockets = []              # six (x, y) pocket centres, hotkey order
+        self.segments = []             # bank legs [((x0, y0), (x1, y1)), ...], final end snapped
+        self.snap_active = False       # final endpoint visually locked to a pocket
+        self.snap_endpoint = None      # (x, y) of the locked pocket
+        self.highlight = None          # (x, y) of the pocket to ring, or None
+        self.dropped = None            # pocket index the bank path falls into, or None
+        self.bank_s = self.snap_s = 0.0  # time spent in the last recompute (instrumentation)
+        self._grid_key = None
+        self._grid = None
+        self._cushion_key = None
+        self._cushions = None
+        self._solver_key = None
+        self._solver_cushions = None
+
+    # ------------- Pockets -------------
+    def pocket_index(self, rect):
+        # Uniform grid over the six pockets, rebuilt only when the table rect changes
+        if rect != self._grid_key:
+            self.pockets = [tuple(p) for p in geo.pocket_centers(rect).tolist()]
+            self._grid = UniformGrid(POCKET_CELL)
+            for i, (x, y) in enumerate(self.pockets): self._grid.insert(i, x, y)
+            self._grid_key = rect
+        return self._grid, self.pockets
+
+    def nearest_pocket(self, rect, x, y, r):
+        # (pocket (x, y), distance) of the closest pocket within r, else (None, 1e9)
+        grid, pts = self.pocket_index(rect)
+        i = grid.nearest(x, y, r, pts)
+        return (None, 1e9) if i is None else (pts[i], math.hypot(pts[i][0] - x, pts[i][1] - y))
+
+    def cushion_model(self, rect, pocket_radius, corner_radius):
+        # Rails, jaws and drop lines, rebuilt only when the table or pocket size changes
+        key = (rect, pocket_radius, corner_radius)
+        if key != self._cushion_key:
+            self._cushions = CushionModel(rect, pocket_radius, corner_radius); self._cushion_key = key
+        return self._cushions
+
+    def solver_model(self, rect, ball_radius, corner_radius):
+        # The same cushions as seen by a ball centre: rails inset by the ball radius, the rail
+        # convention of geometry.solve_banks, so confirm() retraces the legs the solver draws
+        key = (rect, ball_radius, corner_radius)
+        if key != self._solver_key:
+            self._solver_cushions = CushionModel(geo.inset_rect(rect, ball_radius), ball_radius,
+                                                 max(0.0, corner_radius - ball_radius))
+            self._solver_key = key
+        return self._solver_cushions
+
+    # ------------- Refresh -------------
+    def refresh(self, rect, p1, p2, marker, max_banks, pocket_radius, corner_radius=0.0):
+        """Recompute derived geometry if any input changed. Returns True when it did."""
+        key = (rect, p1, p2, marker, max_banks, pocket_radius, corner_radius)
+        if key == self.key: return False
+        self.key = key; self.version += 1
+        self.pocket_index(rect)
+        t0 = time.perf_counter()
+        self.segments = []; self.highlight = None; self.dropped = None
+        dx = p2[0] - p1[0]; dy = p2[1] - p1[1]
+        if max_banks and (dx or dy):
+            pts, self.dropped = self.cushion_model(rect, pocket_radius, corner_radius).trace(p2, (dx, dy), max_banks)
+            self.segments = list(zip(pts[:-1], pts[1:]))
+        t1 = time.perf_counter()
+        if self.segments: self._semi_lock(rect, pocket_radius)
+        self.bank_s, self.snap_s = t1 - t0, time.perf_counter() - t1
+        return True
+
+    def _semi_lock(self, rect, pocket_radius):
+        # --- Semi-lock with hysteresis on FINAL endpoint ---
+        base_snap_r = pocket_radius * 1.4         # stickier by default
+        lock_r = base_snap_r                      # lock-in distance
+        unlock_r = base_snap_r * 2.2              # release distance
+
+        s_last, e_last = self.segments[-1]
+        if self.dropped is not None: nearest, d_last = self.pockets[self.dropped], 0.0     # fell in
+        else: nearest, d_last = self.nearest_pocket(rect, e_last[0], e_last[1], lock_r)
+
+        # If we were snapped previously, keep it until far enough
+        if self.snap_active and self.snap_endpoint is not None:
+            if math.dist(e_last, self.snap_endpoint) <= unlock_r:
+                self.segments[-1] = (s_last, self.snap_endpoint)
+                nearest = self.snap_endpoint
+            else:
+                self.snap_active = False; self.snap_endpoint = None; nearest = None
+
+        # If not already snapped, try to lock in
+        if not self.snap_active and nearest is not None and d_last <= lock_r:
+            self.snap_active = True; self.snap_endpoint = nearest
+            self.segments[-1] = (s_last, nearest)
+
+        # Subtle highlight when snapped/near
+        self.highlight = self.snap_endpoint if self.snap_active else (nearest if (nearest is not None and d_last <= lock_r) else None)
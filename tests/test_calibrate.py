@@ -0,0 +1,34 @@
+# test_calibrate.py
+# Offline check of calibrate.find_table on the bundled screenshots (assets/*.png):
+# playfield rect and the six pocket centres within a few px of the hand-measured fit.
+
+import os, sys, glob
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+pytest.importorskip("PyQt5")           # read_image decodes the PNGs through QtGui
+import calibrate
+
+RECT = (392, 353, 1529, 927)
+POCKETS = [(376, 337), (961, 324), (1544, 337), (380, 951), (960, 956), (1546, 944)]
+RECT_TOL = 8.0                         # px; Menu.png has the panel over the top rail
+POCKET_TOL = 10.0                      # px; the pocket blobs are shaded differently per shot
+
+IMAGES = sorted(glob.glob(os.path.join(ROOT, "assets", "*.png")))
+
+def test_fixtures_present():
+    assert IMAGES
+
+@pytest.mark.parametrize("path", IMAGES, ids=os.path.basename)
+def test_find_table(path):
+    cal = calibrate.find_table(calibrate.read_image(path))
+    assert all(abs(a - b) <= RECT_TOL for a, b in zip(cal.rect, RECT)), cal.rect
+    assert len(cal.pockets) == 6
+    for (x, y), (ex, ey) in zip(cal.pockets, POCKETS):
+        assert abs(x - ex) <= POCKET_TOL and abs(y - ey) <= POCKET_TOL, (x, y, ex, ey)
+
+def test_no_table():
+    with pytest.raises(ValueError):
+        calibrate.find_table(np.zeros((120, 200, 3), np.uint8))
@@ -0,0 +1,70 @@
+# test_cushions.py
+# Qt-free checks of the cushion model: the segment grid finds the same first hit as a scan of
+# every segment, no ray leaves the table through a gap, the batched tracer agrees with trace(),
+# and confirm() keeps exactly the solver paths whose retraced contacts are the drawn legs.
+
+import os, sys, math
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import geometry as geo
+from cushions import CushionModel
+from scene import SceneModel
+
+RECT = (392.0, 353.0, 1525.0, 922.0)
+POCKET_RADIUS = 14.0
+CORNERS = (0.0, 40.0, 100.0)           # corner radius: square, calibrated-looking, heavily rounded
+RAYS = 2000
+CONTACT_TOL = 1e-6                     # px between a retraced contact and the solver's
+
+def _rays(n, seed=1):
+    rng = np.random.default_rng(seed)
+    l, t, r, b = RECT
+    starts = rng.uniform((l + 20, t + 20), (r - 20, b - 20), (n, 2))
+    ang = rng.uniform(0, 2 * math.pi, n)
+    return starts, np.stack([np.cos(ang), np.sin(ang)], axis=1)
+
+@pytest.mark.parametrize("rc", CORNERS)
+def test_grid_matches_brute(rc):
+    grid = CushionModel(RECT, POCKET_RADIUS, rc).grid
+    starts, dirs = _rays(RAYS)
+    for (px, py), (dx, dy) in zip(starts, dirs):
+        t, i = grid.first_hit(px, py, dx, dy)
+        bt, bi = grid._brute(px, py, dx, dy, -1)
+        assert i == bi and t == pytest.approx(bt), (px, py, dx, dy)
+
+@pytest.mark.parametrize("rc", CORNERS)
+def test_no_escaping_rays(rc):
+    model = CushionModel(RECT, POCKET_RADIUS, rc); banks = 12
+    starts, dirs = _rays(RAYS, seed=2)
+    for s, d in zip(starts, dirs):
+        pts, pocket = model.trace(s, d, banks)
+        assert pocket is not None or len(pts) == banks + 1, (tuple(s), tuple(d))
+
+@pytest.mark.parametrize("rc", CORNERS)
+@pytest.mark.parametrize("banks", (1, 2, 4))
+def test_first_drops_matches_trace(rc, banks):
+    model = CushionModel(RECT, POCKET_RADIUS, rc)
+    starts, dirs = _rays(RAYS, seed=3)
+    pocket, leg = model.first_drops(starts, dirs, banks)
+    for k, (s, d) in enumerate(zip(starts, dirs)):
+        pts, p = model.trace(s, d, banks)
+        assert (pocket[k], leg[k]) == ((6, -1) if p is None else (p, len(pts) - 2)), k
+
+@pytest.mark.parametrize("rc", (0.0, 40.0))
+def test_confirm_keeps_drawn_legs(rc):
+    model = SceneModel().solver_model(RECT, POCKET_RADIUS, rc)
+    starts, _ = _rays(30, seed=4)
+    kept = 0
+    for p in map(tuple, starts):
+        sol = geo.solve_banks(p, RECT, 2, ball_radius=POCKET_RADIUS)
+        conf = model.confirm(p, sol); kept += len(conf.pocket)
+        for i in range(len(conf.pocket)):
+            n = int(conf.cushions[i])
+            pts, pocket = model.trace(p, conf.direction[i], n + 1)
+            assert pocket == int(conf.pocket[i]) and len(pts) == n + 2
+            for a, h in zip(pts[1:-1], conf.hits[i, :n]):
+                assert math.hypot(a[0] - h[0], a[1] - h[1]) <= CONTACT_TOL
+    assert kept